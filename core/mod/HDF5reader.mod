@@ -134,12 +134,16 @@ struct Info {
 
     /// data members for general HDF5 usage
     hid_t file_;
+    /// suffix of the currently open file_, -1 if opened by its full name
+    int fileID_;
     float * datamatrix_;
     long long *datavector_;
     char name_group[256];
     hsize_t rowsize_;
     hsize_t columnsize_;
     hid_t acc_tpl1;
+    /// serial file access settings (chunk cache, core driver). Unused with acc_tpl1
+    hid_t file_fapl;
     int mode;
 
     /// Sometimes we want to silence certain warnings
@@ -166,6 +170,7 @@ void initInfo( Info *info )
 {
     // These fields are used when data is being accessed from a dataset
     info->file_ = -1;
+    info->fileID_ = -1;
     info->datamatrix_ = NULL;
     info->datavector_ = NULL;
     info->mode = NONE;
@@ -173,6 +178,7 @@ void initInfo( Info *info )
     info->rowsize_ = 0;
     info->columnsize_ = 0;
     info->acc_tpl1 = -1;
+    info->file_fapl = -1;
     info->verboseLevel = 0;
     // These fields are used exclusively for catalogging which h5 files contain which postsynaptic gids
     info->synapseCatalog.rootName = NULL;
@@ -322,6 +328,11 @@ herr_t loadShareData( hid_t loc_id, const char *name, void *opdata )
 int openFile( Info* info, const char *filename, int fileID, int nRanksPerFile, int startRank, int myRank )
 {
     if( info->file_ != -1 ) {
+        // loadData(gid) opens the file of each gid. Keep the current one (along with its chunk
+        // cache or in-memory image) when it's already the requested one
+        if( nRanksPerFile == 0 && fileID != -1 && fileID == info->fileID_ ) {
+            return 0;
+        }
         H5Fclose(info->file_);
     }
 
@@ -335,10 +346,13 @@ int openFile( Info* info, const char *filename, int fileID, int nRanksPerFile, i
 
     info->name_group[0]='\0';
 
-    hid_t file_driver = (info->acc_tpl1 != -1)? info->acc_tpl1 : H5P_DEFAULT;
+    // Parallel access (acc_tpl1) takes precedence, file_fapl settings are then ignored
+    hid_t file_driver = (info->acc_tpl1 != -1)? info->acc_tpl1 :
+                        (info->file_fapl != -1)? info->file_fapl : H5P_DEFAULT;
 
     // Opens the file with the alternate handler
     info->file_ = H5Fopen( nameoffile, H5F_ACC_RDONLY, file_driver);
+    info->fileID_ = fileID;
     int result = (info->file_ < 0);
     int failed = result;
 
@@ -706,6 +720,26 @@ VERBATIM {
             info->verboseLevel = *getarg(3);
         }
 
+        // Optional serial file access settings. Must be set before opening files and are not
+        // applied with parallel access (acc_tpl1)
+        // arg 4: raw data chunk cache size (bytes)
+        // arg 5: when 1, use the core driver to load whole files in memory on open
+        if( (ifarg(4) && *getarg(4) > 0) || (ifarg(5) && *getarg(5) == 1) ) {
+            info->file_fapl = H5Pcreate(H5P_FILE_ACCESS);
+        }
+        if( ifarg(4) && *getarg(4) > 0 ) {
+            // Only the size changes, keep the library defaults for the remaining settings
+            int mdc_nelmts;
+            size_t rdcc_nslots, rdcc_nbytes;
+            double rdcc_w0;
+            H5Pget_cache(info->file_fapl, &mdc_nelmts, &rdcc_nslots, &rdcc_nbytes, &rdcc_w0);
+            H5Pset_cache(info->file_fapl, mdc_nelmts, rdcc_nslots, (size_t) *getarg(4), rdcc_w0);
+        }
+        if( ifarg(5) && *getarg(5) == 1 ) {
+            // Read-only, no backing store. The increment is irrelevant
+            H5Pset_fapl_core(info->file_fapl, 1 << 20, 0);
+        }
+
         *ip = info;
 
         if( nFiles == 1 ) {
@@ -825,6 +859,11 @@ VERBATIM {
         //printf("Close\n");
         info->file_ = -1;
     }
+    if( info->file_fapl != -1 )
+    {
+        H5Pclose(info->file_fapl);
+        info->file_fapl = -1;
+    }
     if(info->datamatrix_ != NULL)
     {
         free(info->datamatrix_);
@@ -1272,6 +1311,59 @@ ENDVERBATIM
 
 
 
+COMMENT
+/**
+ * Load the whole active dataset (matrix) into a NEURON Vector object, in row-major order.
+ * Allows clients to retrieve all the data of a cell with a single call, instead of one per item
+ *
+ * @param dataset name - used to confirm that the active dataset matches what is requested
+ * @param Vector object to fill - resized to hold rows * columns values
+ * @return the number of rows copied, 0 on error
+ */
+ENDCOMMENT
+FUNCTION getDataMatrix() {
+VERBATIM {
+#ifndef CORENEURON_BUILD
+#ifndef DISABLE_HDF5
+    INFOCAST;
+    Info* info = *ip;
+    IvocVect* pdVec = NULL;
+    double* pd  = NULL;
+    hsize_t i = 0;
+    if(info->file_>=0&& ifarg(1) && hoc_is_str_arg(1) && ifarg(2) )
+    {
+        char name[256];
+        strncpy(name,gargstr(1),256);
+        if(strncmp(info->name_group,name,256) == 0)
+        {
+            if( info->mode != FLOAT_MATRIX ) {
+                fprintf( stderr, "ERROR: getDataMatrix requires matrix data. Unexpected mode: %d\n", info->mode );
+                return 0;
+            }
+            hsize_t total = info->rowsize_ * info->columnsize_;
+            pdVec = vector_arg(2);
+            vector_resize(pdVec, (int) total);
+            pd = vector_vec(pdVec);
+            for( i=0; i<total; i++){
+                pd[i] = info->datamatrix_[i];
+            }
+            return (double) info->rowsize_;
+        }
+        fprintf(stderr, "(Getting data)Error on the name of last loaded data: access:%s loaded:%s\n",name,info->name_group);
+        return 0;
+    }
+    else
+    {
+        return 0;
+    }
+#endif
+#endif  // CORENEURON_BUILD
+}
+ENDVERBATIM
+}
+
+
+
 COMMENT
 /**
  * Retrieve the value for an attribute of the active dataset.  Expected to contain only one value of double type
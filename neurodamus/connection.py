@@ -5,6 +5,7 @@ import logging
 import numpy
 import re
 from enum import Enum
+from functools import lru_cache
 from .core import NeurodamusCore as Nd
 from .core.configuration import GlobalConfig, SimConfig
 from .utils import compat
@@ -78,8 +79,8 @@ class ConnectionBase:
         # Initialized in specific routines
         self._netcons = None
         self._synapses = ()
-        self._delay_vec = Nd.Vector()
-        self._delayweight_vec = Nd.Vector()
+        self._delay_vec = None  # Created on first delayed weight. Rarely used
+        self._delayweight_vec = None
 
     synapse_params = property(lambda self: self._synapse_params)
     synapses = property(lambda self: self._synapses)
@@ -120,6 +121,9 @@ class ConnectionBase:
            delay: the delay time for the new weight
            weight: the weight to adjust to at this time
         """
+        if self._delay_vec is None:
+            self._delay_vec = Nd.Vector()
+            self._delayweight_vec = Nd.Vector()
         self._delay_vec.append(delay)
         self._delayweight_vec.append(weight)
 
@@ -169,6 +173,19 @@ class ConnectionBase:
         return "[%d->%d]" % (self.sgid, self.tgid)
 
 
+@lru_cache(maxsize=32)
+def _mod_override_helper(mod_override):
+    """The hoc template of the helper of a mod override, e.g. GluSynapse -> GluSynapseHelper
+    Synapses are created one by one, so we avoid building and looking up the name every time.
+    """
+    return getattr(Nd.h, mod_override + "Helper")
+
+
+# The global synapse options last set on each mod override mechanism. Options are compared
+# so that those of a new configuration (e.g. new SYNAPSES__ values) get applied as well
+_mod_override_options = {}
+
+
 # ----------------------------------------------------------------------
 # Connection class
 # ----------------------------------------------------------------------
@@ -252,6 +269,29 @@ class Connection(ConnectionBase):
                 continue
             yield syn_i, sc.sec
 
+    @staticmethod
+    def _locations_to_points(target_manager_hoc, tgid, synapses_params):
+        """Resolve the synapse locations of a connection, returning their x's and sections.
+        Uses a single hoc call where TargetManager.hoc provides locationsToPoints.
+        """
+        if hasattr(target_manager_hoc, "locationsToPoints"):
+            syn_points = target_manager_hoc.locationsToPoints(
+                tgid,
+                Nd.Vector(synapses_params["isec"]),
+                Nd.Vector(synapses_params["ipt"]),
+                Nd.Vector(synapses_params["offset"]))
+            return syn_points.x.as_numpy(), list(syn_points.sclst)
+
+        # Older neurodamus-core hoc: resolve locations one by one
+        location_to_point = target_manager_hoc.locationToPoint
+        syn_points = [location_to_point(tgid, isec, ipt, offset)
+                      for isec, ipt, offset in zip(synapses_params["isec"].tolist(),
+                                                   synapses_params["ipt"].tolist(),
+                                                   synapses_params["offset"].tolist())]
+        locations = numpy.fromiter((point.x[0] for point in syn_points), dtype="f8",
+                                   count=len(syn_points))
+        return locations, [point.sclst[0] for point in syn_points]
+
     # -
     def add_synapses(self, target_manager, synapses_params, base_id=0):
         """Adds synapses in bulk.
@@ -264,28 +304,26 @@ class Connection(ConnectionBase):
 
         n_synapses = len(synapses_params)
         synapse_ids = numpy.arange(base_id, base_id+n_synapses, dtype="uint64")
-        mask = numpy.full(n_synapses, True)  # We may need to skip invalid synapses (e.g. on Axon)
 
-        for i, syn_params in enumerate(synapses_params):
-            syn_point = target_manager.hoc.locationToPoint(
-                self.tgid, syn_params['isec'], syn_params['ipt'], syn_params['offset'])
-            syn_params['location'] = syn_point.x[0]
-            section = syn_point.sclst[0]
+        locations, sections = self._locations_to_points(target_manager.hoc, self.tgid,
+                                                        synapses_params)
+        synapses_params["location"] = locations
+        mask = numpy.fromiter((sec.exists() for sec in sections), dtype=bool, count=n_synapses)
 
-            if not section.exists():
-                target_point_str = "({0.isec:.0f} {0.ipt:.0f} {0.offset:.4f})".format(syn_params)
+        if not mask.all():  # We may need to skip invalid synapses (e.g. on Axon)
+            for i in numpy.flatnonzero(~mask):
+                target_point_str = "({0.isec:.0f} {0.ipt:.0f} {0.offset:.4f})".format(
+                    synapses_params[i])
                 logging.warning("SKIPPED Synapse %s on gid %d. Src gid: %d. Deleted TPoint %s",
                                 base_id + i, self.tgid, self.sgid, target_point_str)
-                mask[i] = False
-                continue
-
-            # These are normal lists/arrays, so we cant use masks
-            self._synapse_sections.append(section)
-            self._synapse_points_x.append(syn_point.x[0])
-
-        if not mask.all():
+            sections = [sec for sec, valid in zip(sections, mask) if valid]
             synapses_params = synapses_params[mask]
             synapse_ids = synapse_ids[mask]
+            locations = locations[mask]
+
+        # These are normal lists/arrays, so we cant use masks
+        self._synapse_sections.extend(sections)
+        self._synapse_points_x.extend(locations.tolist())
 
         if self._synapse_params is None or len(self._synapse_params) == 0:  # None or empty
             self._synapse_params = synapses_params
@@ -366,26 +404,35 @@ class Connection(ConnectionBase):
         self._netcons = []
         self._init_artificial_stims(cell, replay_mode)
         n_syns = 0
+        # Bind before the loop, it runs for every synapse
+        points_x = self._synapse_points_x
+        synapses_params = self._synapse_params
+        synapse_ids = self._synapse_ids
+        spont_minis = self._spont_minis
+        replay = self._replay
+        section_in_stack = Nd.section_in_stack
+        create_synapse = self._create_synapse
+        synapses_append = self._synapses.append
+
         for syn_i, sec in self.sections_with_synapses:
-            x = self._synapse_points_x[syn_i]
-            syn_params = self._synapse_params[syn_i]
+            x = points_x[syn_i]
+            syn_params = synapses_params[syn_i]
 
-            with Nd.section_in_stack(sec):
-                syn_obj = self._create_synapse(cell, syn_params, x,
-                                               self._synapse_ids[syn_i], base_seed)
+            with section_in_stack(sec):
+                syn_obj = create_synapse(cell, syn_params, x, synapse_ids[syn_i], base_seed)
                 n_syns += 1
 
-            self._synapses.append(syn_obj)
+            synapses_append(syn_obj)
             # syn_obj.verboseLevel = self.tgid  # debugging purposes
 
             if attach_src_cell:
                 self._attach_source_cell(syn_obj, syn_params)
 
-            if self._spont_minis is not None:
-                self._spont_minis.create_on(self, sec, x, syn_obj, syn_params, base_seed)
+            if spont_minis is not None:
+                spont_minis.create_on(self, sec, x, syn_obj, syn_params, base_seed)
 
-            if self._replay is not None:
-                self._replay.create_on(self, sec, syn_obj, syn_params)
+            if replay is not None:
+                replay.create_on(self, sec, syn_obj, syn_params)
 
             # Delayed connections
             if self._delay_vec is not None:
@@ -399,14 +446,10 @@ class Connection(ConnectionBase):
 
                 syn_obj.setup_delay_vecs(self._delay_vec, self._delayweight_vec)
 
-        # Apply configurations to the synapses
-        # Set global options in mod overrides
-        for mod_override in self._mod_overrides:
-            for syn_option, value in SimConfig.synapse_options.items():
-                syn_opt_name = "{}_{}".format(syn_option, mod_override)
-                if hasattr(Nd.h, syn_opt_name):
-                    setattr(Nd.h, syn_opt_name, value)
+        # Set global options in mod overrides. Being hoc globals, only when they change
+        self._update_mod_override_options()
 
+        # Apply configurations to the synapses
         self._configure_synapses()
         return n_syns
 
@@ -429,12 +472,9 @@ class Connection(ConnectionBase):
         if not self._spont_minis:
             self._spont_minis = None
 
-        # Delayed vecs: release if not used, sort if over 1 value
-        total_delays = self._delay_vec.size()
-        if total_delays == 0:
-            self._delay_vec = None
-            self._delayweight_vec = None
-        elif total_delays > 1:
+        # Delayed vecs: only created if used. Sort if over 1 value
+        total_delays = self._delay_vec.size() if self._delay_vec is not None else 0
+        if total_delays > 1:
             sort_indx = self._delay_vec.sortindex()
             self._delay_vec = Nd.Vector(total_delays).index(self._delay_vec, sort_indx)
             self._delayweight_vec = Nd.Vector(total_delays).index(self._delayweight_vec, sort_indx)
@@ -443,12 +483,29 @@ class Connection(ConnectionBase):
         # See `neurodamus-core.Connection` for explanation. Also pc.gid_connect
         nc = self._pc.gid_connect(self.sgid, syn_obj)
         self.netcon_set_type(nc, syn_obj, NetConType.NC_PRESYN)
-        nc.delay = self.syndelay_override or syn_params.delay
-        nc.weight[0] = syn_params.weight * self.weight_factor
+        nc.delay = self.syndelay_override or syn_params['delay']
+        nc.weight[0] = syn_params['weight'] * self.weight_factor
         nc.threshold = SimConfig.spike_threshold
         self._netcons.append(nc)
         return nc
 
+    @classmethod
+    def _update_mod_override_options(cls):
+        """Set the global synapse options of the mod overrides in use, unless already set"""
+        synapse_options = SimConfig.synapse_options
+        for mod_override in cls._mod_overrides:
+            if _mod_override_options.get(mod_override) != synapse_options:
+                cls._set_mod_override_options(mod_override)
+                _mod_override_options[mod_override] = dict(synapse_options)
+
+    @staticmethod
+    def _set_mod_override_options(mod_override):
+        """Set the global synapse options (e.g. cao_CR) of a mod override mechanism"""
+        for syn_option, value in SimConfig.synapse_options.items():
+            syn_opt_name = "{}_{}".format(syn_option, mod_override)
+            if hasattr(Nd.h, syn_opt_name):
+                setattr(Nd.h, syn_opt_name, value)
+
     # -
     def _create_synapse(self, cell, params_obj, x, syn_id, base_seed):
         """Instantiate synapses (GABBAB inhibitory, AMPANMDA excitatory, etc)
@@ -472,8 +529,7 @@ class Connection(ConnectionBase):
         if self._mod_override is not None:
             mod_override = self._mod_override.get("ModOverride").s
             self._mod_overrides.add(mod_override)
-            override_helper = mod_override + "Helper"
-            helper_cls = getattr(Nd.h, override_helper)
+            helper_cls = _mod_override_helper(mod_override)
             add_params = (self._src_pop_id, self._dst_pop_id, self._mod_override)
         else:
             helper_cls = self._GABAAB_Helper if is_inh else self._AMPANMDA_Helper
@@ -705,7 +761,7 @@ class SpontMinis(ArtificialStim):
         # A simple NetCon will do, as the synapse and cell are local.
         netcon = Nd.NetCon(ips, syn_obj, sec=sec)
         netcon.delay = 0.1
-        netcon.weight[0] = syn_params.weight * conn.weight_factor
+        netcon.weight[0] = syn_params['weight'] * conn.weight_factor
         conn.netcon_set_type(netcon, syn_obj, NetConType.NC_SPONTMINI)
         self._store(ips, netcon)
 
@@ -765,7 +821,7 @@ class InhExcSpontMinis(SpontMinis):
             self.rate_vec_exc.x[0] = spont_rate_exc
 
     def create_on(self, conn, sec, position, syn_obj, syn_params, *args):
-        rate_vec = self.rate_vec if syn_params.synType < 100 else self.rate_vec_exc
+        rate_vec = self.rate_vec if syn_params['synType'] < 100 else self.rate_vec_exc
         if rate_vec:
             # there's a spont rate for this kind of synapse
             super().create_on(conn, sec, position, syn_obj, syn_params, *args, _rate_vec=rate_vec)
@@ -803,8 +859,8 @@ class ReplayStim(ArtificialStim):
             log_all(logging.DEBUG, "Creating Replay on %d-%d, times: %s",
                     conn.sgid, conn.tgid, self.time_vec.as_numpy() if self.has_data() else "N/A")
 
-        nc = Nd.NetCon(vecstim, syn_obj, 10, syn_params.delay, syn_params.weight, sec=sec)
-        nc.weight[0] = syn_params.weight * conn.weight_factor
+        nc = Nd.NetCon(vecstim, syn_obj, 10, syn_params['delay'], syn_params['weight'], sec=sec)
+        nc.weight[0] = syn_params['weight'] * conn.weight_factor
         conn.netcon_set_type(nc, syn_obj, NetConType.NC_REPLAY)
         self._store(vecstim, nc)
         return nc
@@ -95,8 +95,14 @@ class ConnectionSet(object):
         Args:
             conn: The connection object to be stored
         """
+        cell_conns = self._connections_map[conn.tgid]
+        # optimize for ordered insertion (the common case), avoiding the search and list shift
+        if not cell_conns or cell_conns[-1].sgid < conn.sgid:
+            self._conn_count += 1
+            cell_conns.append(conn)
+            return
         cell_conns, pos = self._find_connection(conn.sgid, conn.tgid, exact=False)
-        if cell_conns and pos < len(cell_conns) and cell_conns[pos].sgid == conn.sgid:
+        if pos < len(cell_conns) and cell_conns[pos].sgid == conn.sgid:
             logging.error("Attempt to store existing connection: %d->%d",
                           conn.sgid, conn.tgid)
             return
@@ -318,12 +324,15 @@ class ConnectionManagerBase(object):
         return synapse_file
 
     # - override if needed
-    def _open_synapse_file(self, synapse_file, pop_name, n_nrn_files=None):
+    def _open_synapse_file(self, synapse_file, pop_name, n_nrn_files=None, **reader_kw):
         logging.info("Opening Synapse file %s, population: %s", synapse_file, pop_name)
         return self.SynapseReader.create(
             synapse_file, self.CONNECTIONS_TYPE, pop_name,
             n_nrn_files, self._raw_gids,  # Used eventually by NRN reader
-            extracellular_calcium=SimConfig.extracellular_calcium
+            extracellular_calcium=SimConfig.extracellular_calcium,
+            chunk_cache_bytes=SimConfig.nrn_chunk_cache_bytes,  # Used eventually by NRN reader
+            in_memory=SimConfig.nrn_in_memory,
+            **reader_kw
         )
 
     def _init_conn_population(self, src_pop_name, pop_id_override):
@@ -531,15 +540,18 @@ class ConnectionManagerBase(object):
             only_gids: Create connections only for these tgids (default: Off)
         """
         conn_options = {'weight_factor': weight_factor}
-        pop = self._cur_population
+        # Bind before the loop, it runs for every connection
+        get_or_create_connection = self._cur_population.get_or_create_connection
+        add_synapses = self._add_synapses
+        load_offsets = self._load_offsets
 
         for sgid, tgid, syns_params, extra_params, offset in \
                 self._iterate_conn_params(self._src_target_filter, None, only_gids, True):
-            if self._load_offsets:
+            if load_offsets:
                 conn_options["synapses_offset"] = extra_params["synapse_index"][0]
             # Create all synapses. No need to lock since the whole file is consumed
-            cur_conn = pop.get_or_create_connection(sgid, tgid, **conn_options)
-            self._add_synapses(cur_conn, syns_params, None, offset)
+            cur_conn = get_or_create_connection(sgid, tgid, **conn_options)
+            add_synapses(cur_conn, syns_params, None, offset)
 
     # -
     def connect_group(self, conn_source, conn_destination, synapse_type_restrict=None,
@@ -553,7 +565,6 @@ class ConnectionManagerBase(object):
             mod_override (str): ModOverride given for this connection group
         """
         conn_kwargs = {}
-        pop = self._cur_population
         logging.debug("Connecting group %s -> %s", conn_source, conn_destination)
         src_tname = TargetSpec(conn_source).name
         dst_tname = TargetSpec(conn_destination).name
@@ -565,23 +576,30 @@ class ConnectionManagerBase(object):
                           src_tname, dst_tname)
             return
 
+        # Bind before the loop, it runs for every connection
+        get_or_create_connection = self._cur_population.get_or_create_connection
+        add_synapses = self._add_synapses
+        load_offsets = self._load_offsets
+
         for sgid, tgid, syns_params, extra_params, offset in \
                 self._iterate_conn_params(src_target, dst_target, mod_override=mod_override):
             if sgid == tgid:
                 logging.warning("Making connection within same Gid: %d", sgid)
-            if self._load_offsets:
+            if load_offsets:
                 conn_kwargs["synapses_offset"] = extra_params["synapse_index"][0]
 
-            cur_conn = pop.get_or_create_connection(sgid, tgid, **conn_kwargs)
+            cur_conn = get_or_create_connection(sgid, tgid, **conn_kwargs)
             if cur_conn.locked:
                 continue
-            self._add_synapses(cur_conn, syns_params, synapse_type_restrict, offset)
+            add_synapses(cur_conn, syns_params, synapse_type_restrict, offset)
             cur_conn.locked = True
 
     # -
     def _add_synapses(self, cur_conn, syns_params, syn_type_restrict=None, base_id=0):
         if syn_type_restrict:
-            syns_params = syns_params[syns_params['synType'] != syn_type_restrict]
+            syn_mask = syns_params['synType'] != syn_type_restrict
+            if not syn_mask.all():  # avoid a copy when no synapse is excluded
+                syns_params = syns_params[syn_mask]
 
         cur_conn.add_synapses(self._target_manager, syns_params, base_id)
 
@@ -644,46 +662,65 @@ class ConnectionManagerBase(object):
         self._synapse_reader.configure_override(mod_override)
         self._synapse_reader.preload_data(gids)
         extra_fields = {}  # Without extra fields, reuse this object
+        # Source membership is checked for every tgid. Materialize it once as a gid mask
+        src_mask = src_target and _as_membership_mask(src_target, raw_gids=True)
 
         # NOTE: This routine is quite critical, sitting at the core of synapse processing
         # so it has been carefully optimized with numpy vectorized operations, even if
         # it might lose some readability.
         # For each tgid we obtain the synapse parameters as a record array. We then split it,
         # without copying, yielding ranges (views) of it.
+        # NOTE: Loading is deliberately kept in this thread. SONATA data is read in bulk by
+        # preload_data, HDF5 serializes concurrent reads anyway, and NRN readers and the
+        # parameter post-processing (e.g. delay rounding with dt) go through hoc.
 
         gids = ProgressBar.iter(gids) if show_progress else gids
 
         for base_tgid in gids:
             tgid = base_tgid + tgid_offset
-            syns_params = self._synapse_reader.get_synapse_parameters(base_tgid)
+
+            # We yield ranges of contiguous parameters belonging to the same connection,
+            # and given we have data for a single tgid, enough to group by sgid.
+            # The first row of a range is found by numpy.diff, with -1 (an impossible gid)
+            # padding the boundaries so that the computation stays in integers
+            # When readers provide the sgids alone we can skip building the synapse
+            # parameters for tgids having no connection from the source target.
+
+            syns_params = None
+            sgids = self._synapse_reader.get_source_gids(base_tgid)
+            if sgids is None:
+                syns_params = self._synapse_reader.get_synapse_parameters(base_tgid)
+                sgids = syns_params[syns_params.dtype.names[0]]  # src gid in field 0
+            sgids = sgids.astype("int64")
+            sgids_ranges = numpy.flatnonzero(numpy.diff(sgids, prepend=-1, append=-1))
+            range_starts = sgids_ranges[:-1]
+            range_ends = sgids_ranges[1:]
+            conn_count = len(range_starts)
+
+            if src_target:
+                # keep only the ranges whose sgid belongs to the source target
+                allowed = src_mask[numpy.minimum(sgids[range_starts], len(src_mask) - 1)]
+                range_starts = range_starts[allowed]
+                range_ends = range_ends[allowed]
+            n_yielded_conns = len(range_starts)
+            if not n_yielded_conns:
+                logging.debug("GID %d: No connections from src Target %s", tgid,
+                              src_target and src_target.name)
+                continue
+
+            if syns_params is None:
+                syns_params = self._synapse_reader.get_synapse_parameters(base_tgid)
             logging.debug("GID %d Syn count: %d", tgid, len(syns_params))
 
             if self._load_offsets:
                 syn_index = self._synapse_reader.get_property(base_tgid, "synapse_index")
                 extra_fields = {"synapse_index": syn_index}
 
-            # We yield ranges of contiguous parameters belonging to the same connection,
-            # and given we have data for a single tgid, enough to group by sgid.
-            # The first row of a range is found by numpy.diff
-
-            sgids = syns_params[syns_params.dtype.names[0]].astype("int64")  # src gid in field 0
-            sgids_ranges = numpy.diff(sgids, prepend=numpy.nan, append=numpy.nan).nonzero()[0]
-            conn_count = len(sgids_ranges) - 1
             conn_debugger = self.ConnDebugger()
+            conn_sgids = sgids[range_starts].tolist()
 
-            if src_target:
-                # create a set with the gids that belong both to the synapses and the target
-                unique_sgids = sgids[sgids_ranges[:-1]]
-                allowed_sgids = set(unique_sgids[src_target.contains(unique_sgids, raw_gids=True)])
-                n_yielded_conns = len(allowed_sgids)
-                allowed_ranges = [(sgids_ranges[i], sgids_ranges[i+1]) for i in range(conn_count)
-                                  if sgids[sgids_ranges[i]] in allowed_sgids]
-            else:
-                n_yielded_conns = conn_count
-                allowed_ranges = [(sgids_ranges[i], sgids_ranges[i+1]) for i in range(conn_count)]
-
-            for range_start, range_end in allowed_ranges:
-                sgid = int(sgids[range_start])
+            for sgid, range_start, range_end in zip(conn_sgids, range_starts.tolist(),
+                                                    range_ends.tolist()):
                 final_sgid = sgid + sgid_offset
                 syn_params = syns_params[range_start:range_end]
                 extra_params = extra_fields and {  # reuse empty {}. Dont modify later!
@@ -731,15 +768,26 @@ class ConnectionManagerBase(object):
         populations: List[ConnectionSet] = (conn_population,) if conn_population is not None \
             else self._populations.values()
 
+        if src_target is not None:
+            src_mask = _as_membership_mask(src_target)
+            max_sgid = len(src_mask) - 1
+
         for population in populations:
             logging.debug("Connections from population %s", population)
             tgids = numpy.fromiter(population.target_gids(), 'uint32')
             tgids = numpy.intersect1d(tgids, dst_target.get_gids())
             if selected_gids:
                 tgids = numpy.intersect1d(tgids, selected_gids + tgid_offset)
-            for conn in population.get_connections(tgids):
-                if src_target is None or conn.sgid in src_target:
-                    yield conn
+            if src_target is None:
+                yield from population.get_connections(tgids)
+                continue
+            # Check the source target membership of all tgid connections at once
+            for tgid in tgids.tolist():
+                conns = population.get_connections(tgid)
+                sgids = numpy.fromiter((c.sgid for c in conns), dtype="int64", count=len(conns))
+                for conn, is_src in zip(conns, src_mask[numpy.minimum(sgids, max_sgid)]):
+                    if is_src:
+                        yield conn
 
     # -
     def configure_group(self, conn_config, gidvec=None):
@@ -761,21 +809,25 @@ class ConnectionManagerBase(object):
         syn_params = dict_filter_map(conn_config, _properties)
 
         # Load eventual mod override helper
+        mod_override = None
         if "ModOverride" in conn_config:
             logging.info("   => Overriding mod: %s", conn_config["ModOverride"])
             override_helper = conn_config["ModOverride"] + "Helper"
             Nd.load_hoc(override_helper)
             assert hasattr(Nd.h, override_helper), \
                 "ModOverride helper doesn't define hoc template: " + override_helper
+            # The same (hoc) config is used for all connections, convert it only once
+            mod_override = conn_config.get('hoc') or compat.PyMap(conn_config).hoc_map
+        syn_configure = conn_config.get("SynapseConfigure")
 
         configured_conns = 0
         for conn in self.get_target_connections(src_target, dst_target, gidvec):
             for key, val in syn_params.items():
                 setattr(conn, key, val)
-            if "ModOverride" in conn_config:
-                conn.override_mod(conn_config.get('hoc') or compat.PyMap(conn_config).hoc_map)
-            if "SynapseConfigure" in conn_config:
-                conn.add_synapse_configuration(conn_config["SynapseConfigure"])
+            if mod_override is not None:
+                conn.override_mod(mod_override)
+            if syn_configure is not None:
+                conn.add_synapse_configuration(syn_configure)
             configured_conns += 1
         return configured_conns
 
@@ -1089,6 +1141,18 @@ def _get_projection_population_id(projection):
     return pop_id
 
 
+def _as_membership_mask(target, raw_gids=False):
+    """Materialize the target gids as a boolean array indexed by gid.
+
+    The array has one extra, always False, trailing entry so that lookups can
+    clip larger gids to it, e.g. ``mask[numpy.minimum(gids, len(mask) - 1)]``
+    """
+    gids = numpy.asarray(target.get_raw_gids() if raw_gids else target.get_gids(), dtype=int)
+    mask = numpy.zeros((gids.max() + 2) if gids.size else 1, dtype=bool)
+    mask[gids] = True
+    return mask
+
+
 # ######################################################################
 # SynapseRuleManager
 # ######################################################################
@@ -229,6 +229,8 @@ class _SimConfig(object):
     simulate_model = True
     loadbal_mode = None
     synapse_options = {}
+    nrn_chunk_cache_bytes = None
+    nrn_in_memory = False
     is_sonata_config = False
     spike_location = "soma"
     spike_threshold = -30
@@ -736,6 +738,25 @@ def _single_vesicle(config: _SimConfig, run_conf):
     h.minis_single_vesicle_GluSynapse = minis_single_vesicle
 
 
+@SimConfig.validator
+def _nrn_reader_options(config: _SimConfig, run_conf):
+    """Options for reading (legacy) nrn.h5 edge files"""
+    chunk_cache_bytes = run_conf.get("NrnChunkCacheBytes")
+    if chunk_cache_bytes is not None:
+        chunk_cache_bytes = int(chunk_cache_bytes)
+        if chunk_cache_bytes <= 0:
+            raise ConfigurationError("NrnChunkCacheBytes must be a positive number of bytes")
+        log_verbose("NrnChunkCacheBytes = %d", chunk_cache_bytes)
+    config.nrn_chunk_cache_bytes = chunk_cache_bytes
+
+    in_memory = run_conf.get("NrnInMemory", "False")
+    if in_memory not in ("True", "False", "0", "false"):
+        raise ConfigurationError("NrnInMemory must be True or False")
+    if in_memory == "True":
+        log_verbose("NrnInMemory = True")
+    config.nrn_in_memory = in_memory == "True"
+
+
 @SimConfig.validator
 def _randomize_gaba_risetime(config: _SimConfig, run_conf):
     randomize_risetime = run_conf.get("RandomizeGabaRiseTime")
@@ -6,6 +6,7 @@ from __future__ import absolute_import
 from . import Neuron
 from .random import RNG, gamma
 import logging
+import numpy as np
 
 
 class SignalSource:
@@ -18,8 +19,13 @@ class SignalSource:
             rng: The Random Number Generator. Used in the Noise functions
         """
         h = Neuron.h
-        self.stim_vec = h.Vector()
-        self.time_vec = h.Vector()
+        self._stim_vec = h.Vector()
+        self._time_vec = h.Vector()
+        # Single points are buffered and copied to the hoc Vectors when they are accessed.
+        # Once attached the Vectors may be playing, so points are appended to them directly
+        self._stim_buf = []
+        self._time_buf = []
+        self._attached = False
         self._cur_t = 0
         self._base_amp = base_amp
         self._rng = rng
@@ -27,16 +33,48 @@ class SignalSource:
             self._add_point(base_amp)
             self._cur_t = delay
 
+    @property
+    def time_vec(self):
+        """The hoc Vector of the signal time points"""
+        self._flush_points()
+        return self._time_vec
+
+    @property
+    def stim_vec(self):
+        """The hoc Vector of the signal amplitudes"""
+        self._flush_points()
+        return self._stim_vec
+
     def reset(self):
-        self.stim_vec.resize(0)
-        self.time_vec.resize(0)
+        self._stim_buf.clear()
+        self._time_buf.clear()
+        self._stim_vec.resize(0)
+        self._time_vec.resize(0)
+
+    def _flush_points(self):
+        """Appends the buffered points to the hoc Vectors, in a single call each"""
+        if self._time_buf:
+            self._time_vec.append(Neuron.h.Vector(self._time_buf))
+            self._stim_vec.append(Neuron.h.Vector(self._stim_buf))
+            self._time_buf.clear()
+            self._stim_buf.clear()
 
     def _add_point(self, amp):
         """Appends a single point to the time-signal source.
         Note: It doesnt advance time, not supposed to be called directly
         """
-        self.time_vec.append(self._cur_t)
-        self.stim_vec.append(amp)
+        if self._attached:
+            self._time_vec.append(self._cur_t)
+            self._stim_vec.append(amp)
+            return
+        self._time_buf.append(self._cur_t)
+        self._stim_buf.append(amp)
+
+    def _add_points(self, times, amps):
+        """Appends several points (numpy arrays) at once. Like _add_point, doesnt advance time
+        """
+        self.time_vec.append(Neuron.h.Vector(times))
+        self.stim_vec.append(Neuron.h.Vector(amps))
 
     def delay(self, duration):
         """Increments the ref time so that the next created signal is delayed
@@ -94,9 +132,17 @@ class SignalSource:
         tau = 1000 / frequency
         delay = tau - pulse_duration
         number_pulses = int(total_duration / tau)
-        for _ in range(number_pulses):
-            self.add_pulse(amp, pulse_duration, base_amp=base_amp)
-            self.delay(delay)
+        if number_pulses:
+            # Build all full pulses at once. Pulse start/end times are accumulated in sequence
+            # (cumsum) so they are exactly the same as adding pulses and delays one by one
+            increments = np.empty(2 * number_pulses + 1)
+            increments[0] = self._cur_t
+            increments[1::2] = pulse_duration
+            increments[2::2] = delay
+            pulse_times = np.cumsum(increments)
+            self._add_points(np.repeat(pulse_times[:-1], 2),
+                             np.tile([base_amp, amp, amp, base_amp], number_pulses))
+            self._cur_t = float(pulse_times[-1])
 
         # Add final pulse, possibly partial
         remaining_time = total_duration - number_pulses * tau
@@ -124,10 +170,11 @@ class SignalSource:
         self.time_vec.append(tvec)
         self.delay(total_duration)
 
-        stim = Neuron.h.Vector(len(tvec))
-        stim.sin(freq, .0, step)
-        stim.mul(amp)
-        self.stim_vec.append(stim)
+        # Same as Vector.sin(freq, 0, step).mul(amp), incl. the angular step expression
+        angular_step = 2 * np.pi / 1000 * freq * step
+        stim = np.sin(np.arange(len(tvec)) * angular_step)
+        stim *= amp
+        self.stim_vec.append(Neuron.h.Vector(stim))
         self._add_point(base_amp)  # Last point
         return self
 
@@ -219,7 +266,7 @@ class SignalSource:
         ev.where("<", duration)  # remove events exceeding duration
         ev.div(dt)  # divide events by timestep
 
-        nev = Neuron.h.Vector([round(x) for x in ev])  # round to integer timestep index
+        nev = Neuron.h.Vector(np.rint(ev.as_numpy()))  # round (half even) to timestep index
         nev.where("<", ntstep)  # remove events exceeding number of timesteps
 
         sign = 1
@@ -233,9 +280,9 @@ class SignalSource:
         # sample gamma-distributed amplitudes
         amp = gamma(rng, gamma_shape, gamma_scale, len(nev))
 
-        E = Neuron.h.Vector(ntstep, 0)  # full signal
-        for n, A in zip(nev, amp):
-            E.x[int(n)] += sign * A  # add impulses, may overlap due to rounding to timestep
+        E = np.zeros(ntstep)  # full signal
+        # add impulses, may overlap due to rounding to timestep (accumulated in order)
+        np.add.at(E, nev.as_numpy().astype(int), sign * amp.as_numpy())
 
         # perform equivalent of convolution with bi-exponential impulse response
         # through a composite autoregressive process with impulse train as innovations
@@ -248,16 +295,19 @@ class SignalSource:
         t_peak = log(R / D) / (R - D)
         A = (a / b - 1) / (a ** t_peak - b ** t_peak)
 
-        P = Neuron.h.Vector(ntstep, 0)
-        B = Neuron.h.Vector(ntstep, 0)
+        # The recursion is sequential. Run it on plain python floats, not hoc Vector items
+        P = [0.0] * ntstep
+        B = [0.0] * ntstep
+        E = E.tolist()
 
         # composite autoregressive process with exact solution
         # P[n] = b * (a ^ n - b ^ n) / (a - b)
         # for unit response B[0] = P[0] = 0, E[0] = 1
         for n in range(1, ntstep):
-            P.x[n] = a * P[n - 1] + b * B[n - 1]
-            B.x[n] = b * B[n - 1] + E[n - 1]
+            P[n] = a * P[n - 1] + b * B[n - 1]
+            B[n] = b * B[n - 1] + E[n - 1]
 
+        P = Neuron.h.Vector(P)
         P.mul(A)  # normalize to peak amplitude
 
         self._add_point(self._base_amp)
@@ -289,8 +339,6 @@ class SignalSource:
         tvec.indgen(self._cur_t, self._cur_t + duration, dt)  # time vector
         ntstep = len(tvec)  # total number of timesteps
 
-        svec = Neuron.h.Vector(ntstep, 0)  # stim vector
-
         noise = Neuron.h.Vector(ntstep)  # Gaussian noise
         rng.normal(0.0, 1.0)
         noise.setrand(rng)  # generate Gaussian noise
@@ -303,8 +351,12 @@ class SignalSource:
             noise.mul(A)  # scale noise by amplitude [uS]
 
             # Exact update formula (independent of dt) from Gillespie 1996
+            # Sequential, so run on plain python floats, not hoc Vector items
+            noise = noise.to_python()
+            svec = [0.0] * ntstep  # stim vector
             for n in range(1, ntstep):
-                svec.x[n] = svec[n - 1] * mu + noise[n]  # signal [uS]
+                svec[n] = svec[n - 1] * mu + noise[n]  # signal [uS]
+            svec = Neuron.h.Vector(svec)
 
         svec.add(mean)  # shift signal by mean value [uS]
 
@@ -372,7 +424,7 @@ class CurrentSource(SignalSource):
         Creates a new current source that injects a signal under IClamp
         """
         super().__init__(base_amp, delay=delay, rng=rng)
-        self._clamps = set()
+        self._clamps = []
         self._all_sources.append(self)
 
     class _Clamp:
@@ -389,21 +441,22 @@ class CurrentSource(SignalSource):
                     setattr(self.clamp, param, val)
             # Clamps must be kept otherwise they are garbage-collected
             self._all_clamps = clamp_container
-            clamp_container.add(self)
+            clamp_container.append(self)
 
         def detach(self):
             """Detaches a clamp from a cell, destroying it"""
-            self._all_clamps.discard(self)
+            self._all_clamps.remove(self)
             del self.clamp  # Force del on the clamp (there might be references to self)
 
     def attach_to(self, section, position=0.5):
+        self._attached = True
         return CurrentSource._Clamp(section, position, self._clamps, True,
                                     self.time_vec, self.stim_vec)
 
     # Constant has a special attach_to and doesnt share any composing method
     class Constant:
         """Class implementing a minimal IClamp for a Constant current."""
-        _clamps = set()
+        _clamps = []
 
         def __init__(self, amp, duration, delay=0):
             self._amp = amp
@@ -427,7 +480,7 @@ class ConductanceSource(SignalSource):
         """
         super().__init__(0.0, delay=delay, rng=rng)  # set SignalSource's base_amp to zero
         self._reversal = reversal   # set reversal from base_amp parameter in classmethods
-        self._clamps = set()
+        self._clamps = []
         self._all_sources.append(self)
 
     class _DynamicClamp:
@@ -452,14 +505,15 @@ class ConductanceSource(SignalSource):
                     setattr(self.clamp, param, val)
             # Clamps must be kept otherwise they are garbage-collected
             self._all_clamps = clamp_container
-            clamp_container.add(self)
+            clamp_container.append(self)
 
         def detach(self):
             """Detaches a clamp from a cell, destroying it"""
-            self._all_clamps.discard(self)
+            self._all_clamps.remove(self)
             del self.clamp  # Force del on the clamp (there might be references to self)
 
     def attach_to(self, section, position=0.5):
+        self._attached = True
         return ConductanceSource._DynamicClamp(section, position, self._clamps, True,
                                                self.time_vec, self.stim_vec, self._reversal)
 
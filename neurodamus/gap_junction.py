@@ -4,13 +4,13 @@ Main module for handling and instantiating synaptical connections
 from __future__ import absolute_import
 import logging
 import numpy as np
+import warnings
 from os import path as ospath
 
 from .connection_manager import ConnectionManagerBase
 from .core.configuration import ConfigurationError
 from .io.synapse_reader import SynapseReader, SonataReader, SynReaderNRN, SynapseParameters,\
     _get_sonata_circuit
-from .utils import compat
 from .utils.logging import log_verbose
 
 
@@ -51,8 +51,8 @@ class GapJunctionConnParameters(SynapseParameters):
     @classmethod
     def create_array(cls, length):
         npa = np.recarray(length, cls.dtype)
-        npa.ipt = -1
-        npa.location = 0.5
+        npa['ipt'] = -1
+        npa['location'] = 0.5
         return npa
 
 
@@ -121,14 +121,16 @@ class GapJunctionManager(ConnectionManagerBase):
         log_verbose("Computing gap-junction offsets from gjinfo.txt")
         gjfname = ospath.join(gj_dir, "gjinfo.txt")
         assert ospath.isfile(gjfname), "Nrn-format GapJunctions require gjinfo.txt: %s" % gj_dir
-        gj_offsets = compat.Vector("I")
-        gj_sum = 0
-
-        for line in open(gjfname):
-            gj_offsets.append(gj_sum)  # fist gid has no offset. the final total is not used
-            gid, offset = map(int, line.strip().split())
-            gj_sum += 2 * offset
-
+        # Each line holds "gid gj_count". Offsets are the cumulative 2 * gj_count of the
+        # previous gids: first gid has no offset. the final total is not used
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", UserWarning)  # Empty files are valid
+            gj_info = np.loadtxt(gjfname, dtype="int64", ndmin=2)
+        if not gj_info.size:
+            return np.zeros(0, dtype="int64")
+        gj_counts = gj_info[:, 1]
+        gj_offsets = np.zeros(len(gj_counts), dtype="int64")
+        np.cumsum(2 * gj_counts[:-1], out=gj_offsets[1:])
         return gj_offsets
 
     def create_connections(self, *_, **_kw):
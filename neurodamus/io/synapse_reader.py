@@ -4,13 +4,17 @@ Module implementing interfaces to the several synapse readers (eg.: synapsetool,
 import logging
 import os
 from abc import abstractmethod
+from functools import lru_cache
 
 import libsonata
 import numpy as np
 
 from ..core import NeurodamusCore as Nd, MPI
+from ..utils import compat
 from ..utils.logging import log_verbose
 
+_HDF5_SIGNATURE = b"\x89HDF\r\n\x1a\n"
+
 
 def _get_sonata_circuit(path):
     """Returns a SONATA edge file in path if present
@@ -22,17 +26,27 @@ def _get_sonata_circuit(path):
     elif path.endswith(".sonata"):
         return path
     elif path.endswith(".h5"):
+        with open(path, "rb") as f:
+            if f.read(len(_HDF5_SIGNATURE)) != _HDF5_SIGNATURE:
+                return None
         import h5py
-        f = h5py.File(path, 'r')
-        if "edges" in f:
-            return path
+        with h5py.File(path, 'r') as f:
+            if "edges" in f:
+                return path
     return None
 
 
 def _constrained_hill(K_half, y):
+    """(K_half**4 + 16) / 16 * y**4 / (K_half**4 + y**4), reusing the K_half**4 buffer
+    """
     K_half_fourth = K_half**4
     y_fourth = y**4
-    return (K_half_fourth + 16) / 16 * y_fourth / (K_half_fourth + y_fourth)
+    denominator = K_half_fourth + y_fourth
+    K_half_fourth += 16
+    K_half_fourth /= 16
+    K_half_fourth *= y_fourth
+    K_half_fourth /= denominator
+    return K_half_fourth
 
 
 class _SynParametersMeta(type):
@@ -40,8 +54,9 @@ class _SynParametersMeta(type):
         type.__init__(cls, name, bases, attrs)
         # Init public properties of the class
         assert hasattr(cls, "_synapse_fields"), "Please define _synapse_fields class attr"
+        field_types = getattr(cls, "_synapse_field_types", {})  # default: f8
         cls.dtype = np.dtype({"names": cls._synapse_fields,
-                              "formats": ["f8"] * len(cls._synapse_fields)})
+                              "formats": [field_types.get(f, "f8") for f in cls._synapse_fields]})
         cls.empty = np.recarray(0, cls.dtype)
 
 
@@ -51,6 +66,9 @@ class SynapseParameters(metaclass=_SynParametersMeta):
     _synapse_fields = ("sgid", "delay", "isec", "ipt", "offset", "weight", "U", "D", "F",
                        "DTC", "synType", "nrrp", "u_hill_coefficient", "conductance_ratio",
                        "maskValue", "location")  # total: 16
+    # Integer-valued fields stored compactly. Gids and the remaining values stay f8
+    # since they are used in precise arithmetic (e.g. gid offsetting, delay rounding)
+    _synapse_field_types = {"isec": "i4", "ipt": "i4", "synType": "i4", "nrrp": "i4"}
 
     def __new__(cls, *_):
         raise NotImplementedError()
@@ -58,9 +76,9 @@ class SynapseParameters(metaclass=_SynParametersMeta):
     @classmethod
     def create_array(cls, length):
         npa = np.recarray(length, cls.dtype)
-        npa.conductance_ratio = -1  # set to -1 (not-set). 0 is meaningful
-        npa.maskValue = -1
-        npa.location = 0.5
+        npa['conductance_ratio'] = -1  # set to -1 (not-set). 0 is meaningful
+        npa['maskValue'] = -1
+        npa['location'] = 0.5
         return npa
 
     @classmethod
@@ -70,6 +88,17 @@ class SynapseParameters(metaclass=_SynParametersMeta):
         return new_params
 
 
+@lru_cache(maxsize=None)
+def _override_synapse_parameters(extra_fields):
+    """The SynapseParameters subclass with the extra fields of a mod override.
+    Cached, so that readers of the same override share the class (and its dtype)
+    """
+    class CustomSynapseParameters(SynapseParameters):
+        _synapse_fields = SynapseParameters._synapse_fields + extra_fields
+
+    return CustomSynapseParameters
+
+
 class SynapseReader(object):
     """ Synapse Readers base class.
         Factory create() will attempt to instantiate SynReaderSynTool, followed by SynReaderNRN.
@@ -103,14 +132,10 @@ class SynapseReader(object):
         # Read attribute names with format "attr1;attr2;attr3"
         attr_names = getattr(Nd, override_helper + "_NeededAttributes", None)
         if attr_names:
-            log_verbose('Reading parameters "{}" for mod override: {}'.format(
-                ", ".join(attr_names.split(";")), mod_override))
-
-            class CustomSynapseParameters(SynapseParameters):
-                _synapse_fields = tuple(attr_names.split(";"))
-
             self._extra_fields = tuple(attr_names.split(";"))
-            self._extra_fields_parameters = CustomSynapseParameters
+            log_verbose('Reading parameters "{}" for mod override: {}'.format(
+                ", ".join(self._extra_fields), mod_override))
+            self._extra_fields_parameters = _override_synapse_parameters(self._extra_fields)
 
         # Read attribute names with format "attr1;attr2;attr3"
         attr_names = getattr(Nd, override_helper + "_UHillScaleVariables", None)
@@ -131,17 +156,33 @@ class SynapseReader(object):
             self._syn_params[gid] = syn_params  # cache parameters
         return syn_params
 
+    def get_source_gids(self, gid):
+        """Obtains the source gids of the synapses of a given gid, in the same order as
+        the synapse parameters, if available without building the full records.
+        Readers with no such pre-loaded data return None.
+        """
+        return None
+
     @abstractmethod
     def _load_synapse_parameters(self, gid):
         """The low level reading of synapses subclasses must override"""
         pass
 
-    @staticmethod
-    def _patch_delay_fp_inaccuracies(records):
+    @classmethod
+    def _patch_delay_fp_inaccuracies(cls, records):
         if len(records) == 0 or 'delay' not in records.dtype.names:
             return
+        cls._round_delays(records["delay"])
+
+    @staticmethod
+    def _round_delays(delay):
+        """Round down (f8) delays to dt multiples, in place: delay = int(delay / dt + 1e-5) * dt
+        """
         dt = Nd.dt
-        records.delay = (records.delay / dt + 1e-5).astype('i4') * dt
+        steps = delay / dt
+        steps += 1e-5
+        np.trunc(steps, out=steps)
+        np.multiply(steps, dt, out=delay)
 
     @staticmethod
     def _scale_U_param(syn_params, extra_cellular_calcium, extra_scale_vars):
@@ -150,8 +191,13 @@ class SynapseReader(object):
         if extra_cellular_calcium is None:
             return
 
-        scale_factors = _constrained_hill(syn_params.u_hill_coefficient,
-                                          extra_cellular_calcium)
+        u_hill = syn_params.u_hill_coefficient
+        if (u_hill == u_hill[0]).all():
+            # Common case of a single coefficient, compute the scale factor only once.
+            # Keep it an array: numpy array and scalar powers may differ in the last bit
+            scale_factors = _constrained_hill(u_hill[:1], extra_cellular_calcium)
+        else:
+            scale_factors = _constrained_hill(u_hill, extra_cellular_calcium)
         syn_params.U *= scale_factors
 
         for scale_var in extra_scale_vars:
@@ -205,6 +251,14 @@ class SonataReader(SynapseReader):
     FIXME Remove the caching at the np.recarray level.
     """
     SYNAPSE_INDEX_NAMES = set(["synapse_index"])
+    # Preloaded columns moved into the packed records (all but sgid, maskValue, location)
+    _packed_fields = SynapseParameters._synapse_fields[1:-2]
+
+    @classmethod
+    def _patch_delay_fp_inaccuracies(cls, records):
+        # Rounding moved into the bulk delay conversion of preload_data, done as whole
+        # columns of all the loaded gids. Nothing left to patch per gid
+        pass
 
     def _open_file(self, src, population, _):
         storage = libsonata.EdgeStorage(src)
@@ -212,6 +266,8 @@ class SonataReader(SynapseReader):
             assert len(storage.population_names) == 1
             population = next(iter(storage.population_names))
         self._population = storage.open_population(population)
+        # libsonata builds the names set on every access. Those are checked many times
+        self._attribute_names = set(self._population.attribute_names)
         self._data = {}
 
     def has_nrrp(self):
@@ -221,13 +277,18 @@ class SonataReader(SynapseReader):
     def has_property(self, field_name):
         if field_name in self.SYNAPSE_INDEX_NAMES:
             return True
-        return field_name in self._population.attribute_names
+        return field_name in self._attribute_names
 
     def get_property(self, gid, field_name):
         """Retrieves a full pre-loaded property given a gid and the property name.
         """
         return self._data[gid][field_name]
 
+    def get_source_gids(self, gid):
+        if gid not in self._data:
+            self.preload_data([gid])
+        return self._data[gid]["sgid"]
+
     def preload_data(self, ids):
         """Preload SONATA fields for the specified IDs"""
         needed_ids = sorted(set(ids) - set(self._data.keys()))
@@ -236,20 +297,43 @@ class SonataReader(SynapseReader):
         tgids = self._population.target_nodes(needed_edge_ids) + 1
         sgids = self._population.source_nodes(needed_edge_ids) + 1
 
+        def _group_by_gid():
+            """Find the edges of each gid as ranges of the (stable) sorted edge arrays.
+            Edges are normally already sorted by target, in which case we skip reordering
+            """
+            order = None if (tgids[:-1] <= tgids[1:]).all() else np.argsort(tgids, kind="stable")
+            sorted_tgids = tgids if order is None else tgids[order]
+            # Edges only target needed_ids, so every gid range ends where the next starts
+            starts = np.searchsorted(sorted_tgids, needed_ids).tolist()
+            ends = starts[1:] + [len(sorted_tgids)]
+            # Resolve each gid's dict of columns once, not for every field
+            gid_dicts = [self._data.setdefault(gid, {}) for gid in needed_ids]
+            return order, list(zip(gid_dicts, starts, ends))
+
+        order, gid_ranges = _group_by_gid()
+
+        # Column for missing optional attributes. Constant, hence shared and never reordered
+        default_columns = {}
+
         def _populate(field, data):
-            for gid in needed_ids:
-                idx = tgids == gid
-                self._data.setdefault(gid, {})[field] = data[idx]
+            if order is not None and data is not default_columns.get(len(data)):
+                data = data[order]
+            for gid_data, start, end in gid_ranges:
+                gid_data[field] = data[start:end]
 
         def _read(attribute, optional):
-            if attribute in self._population.attribute_names:
+            if attribute in self._attribute_names:
                 return self._population.get_attribute(attribute, needed_edge_ids)
             elif optional:
                 if attribute:
                     log_verbose("Defaulting to -1.0 for attribute %s", attribute)
-                # Without the dtype, will default to unsigned int like tgids and
-                # underflow!
-                return np.full_like(tgids, -1.0, dtype="f8")
+                if len(tgids) not in default_columns:
+                    # Without the dtype, will default to unsigned int like tgids and
+                    # underflow!
+                    default_column = np.full_like(tgids, -1.0, dtype="f8")
+                    default_column.flags.writeable = False
+                    default_columns[len(tgids)] = default_column
+                return default_columns[len(tgids)]
             else:
                 raise AttributeError(f"Missing attribute {attribute} in the SONATA edge file")
 
@@ -257,7 +341,9 @@ class SonataReader(SynapseReader):
         _populate("sgid", sgids)
 
         # Synaptic properties
-        _populate("delay", _read("delay", False))
+        delays = _read("delay", False).astype("f8")  # Take f8 before rounding
+        self._round_delays(delays)
+        _populate("delay", delays)
         _populate("weight", _read("conductance", False))
         _populate("U", _read("u_syn", False))
         _populate("D", _read("depression_time", False))
@@ -321,6 +407,7 @@ class SonataReader(SynapseReader):
                 needed_ids = now_needed_ids
                 needed_edge_ids = self._population.afferent_edges([gid - 1 for gid in needed_ids])
                 tgids = self._population.target_nodes(needed_edge_ids) + 1
+                order, gid_ranges = _group_by_gid()
             _populate(name, _read(name, False))
 
     def _load_synapse_parameters(self, gid):
@@ -329,15 +416,11 @@ class SonataReader(SynapseReader):
 
         data = self._data[gid]
 
-        if self._extra_fields:
-            class CustomSynapseParameters(SynapseParameters):
-                _synapse_fields = SynapseParameters._synapse_fields + self._extra_fields
-            conn_syn_params = CustomSynapseParameters.create_array(len(data["sgid"]))
-        else:
-            conn_syn_params = SynapseParameters.create_array(len(data["sgid"]))
+        params_cls = self._extra_fields_parameters or SynapseParameters
+        conn_syn_params = params_cls.create_array(len(data["sgid"]))
 
         conn_syn_params["sgid"] = data["sgid"]
-        for name in SynapseParameters._synapse_fields[1:-2]:
+        for name in self._packed_fields:
             conn_syn_params[name] = data[name]
         if self._extra_fields:
             for name in self._extra_fields:
@@ -348,7 +431,19 @@ class SonataReader(SynapseReader):
 
 class SynReaderNRN(SynapseReader):
     """ Synapse Reader for NRN format only, using the hdf5_reader mod.
+
+    The HDF5 raw data chunk cache size can be tuned with the `chunk_cache_bytes`
+    keyword argument (default: library default, 1MB). With `in_memory=True` the file
+    is loaded in memory once, when opened (HDF5 core driver), so that loading the cell
+    datasets doesn't hit the disk. Only for a single nrn file fitting comfortably in memory.
     """
+    # Synapse parameters fields and their column in the nrn datasets
+    _field_columns = (
+        ("sgid", 0), ("delay", 1), ("isec", 2), ("ipt", 3), ("offset", 4), ("weight", 8),
+        ("U", 9), ("D", 10), ("F", 11), ("DTC", 12), ("synType", 13)
+    )
+    _nrrp_column = 17  # nrn version > 4
+
     def __init__(self,
                  syn_src, conn_type, population=None,
                  n_synapse_files=None, local_gids=(),  # Specific to NRNReader
@@ -364,19 +459,29 @@ class SynReaderNRN(SynapseReader):
 
         # Generic init now that we know the file
         self._n_synapse_files = n_synapse_files or 1  # needed during init
+        self._chunk_cache_bytes = kw.get("chunk_cache_bytes") or 0
+        self._in_memory = bool(kw.get("in_memory"))
+        if self._in_memory and self._n_synapse_files > 1:
+            # cells are spread across files, opened in turn. They'd be loaded over and over
+            raise RuntimeError("NRN in_memory reading requires a single synapse file")
         SynapseReader.__init__(self, syn_src, conn_type, population, **kw)
 
         if self._n_synapse_files > 1:
             vec = Nd.Vector(len(local_gids))  # excg-location requires true vector
-            for num in local_gids:
-                vec.append(num)
+            vec.append(compat.hoc_vector(np.asarray(local_gids, dtype="f8")))  # single hoc call
             self._syn_reader.exchangeSynapseLocations(vec)
 
     def _open_file(self, syn_src, population, verbose=False):
         if population:
             raise RuntimeError("HDF5Reader doesn't support Populations.")
         log_verbose("Opening synapse file: %s", syn_src)
-        self._syn_reader = Nd.HDF5Reader(syn_src, self._n_synapse_files)
+        if self._chunk_cache_bytes or self._in_memory:
+            log_verbose("HDF5 chunk cache size: %d bytes. In memory: %s",
+                        self._chunk_cache_bytes, self._in_memory)
+            self._syn_reader = Nd.HDF5Reader(syn_src, self._n_synapse_files, 0,
+                                             self._chunk_cache_bytes, int(self._in_memory))
+        else:
+            self._syn_reader = Nd.HDF5Reader(syn_src, self._n_synapse_files)
         self.nrn_version = self._syn_reader.checkVersion()
 
     def has_nrrp(self):
@@ -399,33 +504,42 @@ class SynReaderNRN(SynapseReader):
         if nrow == 0:
             return SynapseParameters.empty
 
+        syn_vec = Nd.Vector()  # holds the data of the syn_block view
+        syn_block = self._read_dataset(cell_name, nrow, syn_vec)
         conn_syn_params = SynapseParameters.create_array(nrow)
-        has_nrrp = self.has_nrrp()
-
-        for i in range(nrow):
-            params = conn_syn_params[i]
-            params[0] = reader.getData(cell_name, i, 0)   # sgid
-            params[1] = reader.getData(cell_name, i, 1)   # delay
-            params[2] = reader.getData(cell_name, i, 2)   # isec
-            params[3] = reader.getData(cell_name, i, 3)   # ipt
-            params[4] = reader.getData(cell_name, i, 4)   # offset
-            params[5] = reader.getData(cell_name, i, 8)   # weight
-            params[6] = reader.getData(cell_name, i, 9)   # U
-            params[7] = reader.getData(cell_name, i, 10)  # D
-            params[8] = reader.getData(cell_name, i, 11)  # F
-            params[9] = reader.getData(cell_name, i, 12)  # DTC
-            params[10] = reader.getData(cell_name, i, 13)  # isynType
-            if has_nrrp:
-                params[11] = reader.getData(cell_name, i, 17)  # nrrp
-            else:
-                params[11] = -1
+        for field, column in self._field_columns:
+            conn_syn_params[field] = syn_block[:, column]
+        conn_syn_params["nrrp"] = syn_block[:, self._nrrp_column] if self.has_nrrp() else -1
 
-            # placeholder for u_hill_coefficient and conductance_ratio, not supported by HDF5Reader
-            params[12] = -1
-            params[13] = -1
+        # placeholder for u_hill_coefficient, not supported by HDF5Reader
+        # (conductance_ratio is already set to -1 by create_array)
+        conn_syn_params["u_hill_coefficient"] = -1
 
         return conn_syn_params
 
+    def _read_dataset(self, cell_name, nrow, syn_vec):
+        """Read the (last loaded) dataset of a cell as a (nrow x ncols) array.
+        Fetched in a single call into syn_vec, which the array is a view of, unless the
+        HDF5Reader mod predates getDataMatrix
+        """
+        reader = self._syn_reader
+        ncols = int(reader.getNoOfColumns(cell_name))
+        if hasattr(reader, "getDataMatrix"):
+            if reader.getDataMatrix(cell_name, syn_vec) != nrow:
+                raise RuntimeError("Failed to read synapse dataset %s (expected %d rows)"
+                                   % (cell_name, nrow))
+            return syn_vec.as_numpy().reshape(nrow, ncols)
+
+        # Older neurodamus-core: read the used columns value by value
+        columns = [column for _, column in self._field_columns]
+        if self.has_nrrp():
+            columns.append(self._nrrp_column)
+        get_data = reader.getData
+        syn_block = np.zeros((nrow, ncols))
+        for column in columns:
+            syn_block[:, column] = [get_data(cell_name, i, column) for i in range(nrow)]
+        return syn_block
+
 
 class SynToolNotAvail(Exception):
     """Exception thrown when the circuit requires SynapseTool and it is NOT built-in.
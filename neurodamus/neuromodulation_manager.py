@@ -64,14 +64,14 @@ class NeuroModulationConnection(Connection):
             # For neuron, create NetCon with source from replay stim
             if SimConfig.use_coreneuron:
                 nc = self._pc.gid_connect(self.sgid, syn_obj)
-                nc.delay = syn_params.delay
+                nc.delay = syn_params['delay']
                 self._netcons.append(nc)
             elif self._replay is not None:
                 nc = self._replay.create_on(self, sec, syn_obj, syn_params)
             if nc:
                 nc.weight[0] = int(self.weight_factor > 0)  # weight is binary 1/0, default 1
-                nc.weight[1] = self.neuromod_strength or syn_params.neuromod_strength
-                nc.weight[2] = self.neuromod_dtc or syn_params.neuromod_dtc
+                nc.weight[1] = self.neuromod_strength or syn_params['neuromod_strength']
+                nc.weight[2] = self.neuromod_dtc or syn_params['neuromod_dtc']
                 self.netcon_set_type(nc, syn_obj, NetConType.NC_NEUROMODULATOR)
                 if GlobalConfig.debug_conn == [self.tgid]:
                     log_all(logging.DEBUG, "Neuromodulatory event on tgid: %d, " +
@@ -85,16 +85,16 @@ class NeuroModulationConnection(Connection):
         """
         if not base_conns:
             return None
-        section_i = syn_params.isec
-        location_i = syn_params.location
+        section_i = syn_params['isec']
+        location_i = syn_params['location']
         min_diff = 0.05
         syn_obj = None
         for base_conn in base_conns:
             for syn_j, _ in base_conn.sections_with_synapses:
                 params_j = base_conn._synapse_params[syn_j]
-                if params_j.isec != section_i:
+                if params_j['isec'] != section_i:
                     continue
-                diff = abs(params_j.location - location_i)
+                diff = abs(params_j['location'] - location_i)
                 if diff < min_diff:
                     syn_obj = base_conn._synapses[syn_j]
                     min_diff = diff
@@ -132,8 +132,8 @@ class NeuroModulationSonataReader(SonataReader):
 
         record_size = len(requested_fields)
         conn_syn_params = ModulationConnParameters.create_array(nrow)
-        conn_syn_params.ipt = -1
-        conn_syn_params.weight = 1.
+        conn_syn_params['ipt'] = -1
+        conn_syn_params['weight'] = 1.
         supported_nfields = len(conn_syn_params.dtype) - 2  # location, ipt is not read from data
         return nrow, record_size, supported_nfields, conn_syn_params
 
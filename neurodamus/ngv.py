@@ -417,8 +417,9 @@ class NeuroGliaConnManager(ConnectionManagerBase):
             tgid_syn_offset = syn_gid_base + conn.synapses_offset
             logging.debug("Tgid: %d, Base syn offset: %d", conn.tgid, tgid_syn_offset)
 
+            syn_types = conn.synapse_params['synType']
             for param_i, sec in conn.sections_with_synapses:
-                if conn.synapse_params[param_i].synType >= 100:  # Only Excitatory
+                if syn_types[param_i] >= 100:  # Only Excitatory
                     synapse_gid = tgid_syn_offset + param_i
                     pc.set_gid2node(synapse_gid, MPI.rank)
                     netcon = Nd.NetCon(syn_objs[param_i]._ref_Ustate, None, 0, 0, 1.1, sec=sec)
@@ -437,12 +438,13 @@ class NeuroGliaConnManager(ConnectionManagerBase):
         # Get the total amount of synapses per rank and compute the base
         # synapse_gid (sum synapse count in all previous ranks)
         syn_counts = Nd.Vector(MPI.size)
-        local_syn_count = sum(len(conn.synapses) for conn in base_manager.all_connections())
+        all_conns = list(base_manager.all_connections())  # iterated twice
+        local_syn_count = sum(len(conn.synapses) for conn in all_conns)
         MPI.allgather(local_syn_count, syn_counts)
         if MPI.rank > 0:
             syn_gid_base += syn_counts.sum(0, MPI.rank - 1)
 
-        for conn in base_manager.all_connections():
+        for conn in all_conns:
             # Conn objects have a placeholder (syn_gid_base) for storing the id
             # for its first synapse. This enables getting to the synapse directly
             conn.syn_gid_base = syn_gid_base
@@ -452,8 +454,9 @@ class NeuroGliaConnManager(ConnectionManagerBase):
             logging.debug("Tgid: %d, Base syn gid: %d, Base syn offset: %d",
                           conn.tgid, conn.syn_gid_base, conn.synapses_offset)
 
+            syn_types = conn.synapse_params['synType']
             for syn_i, (param_i, sec) in enumerate(conn.sections_with_synapses):
-                if conn.synapse_params[param_i].synType >= 100:  # Only Excitatory
+                if syn_types[param_i] >= 100:  # Only Excitatory
                     synapse_gid = syn_gid_base + syn_i
                     pc.set_gid2node(synapse_gid, MPI.rank)
                     netcon = Nd.NetCon(syn_objs[syn_i]._ref_Ustate, None, 0, 0, 1.1, sec=sec)
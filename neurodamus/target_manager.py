@@ -96,6 +96,8 @@ class TargetManager:
         self._has_hoc_targets = False
         self.hoc = None  # The hoc level target manager
         self._targets = {}
+        # Cache of population subtargets, by (target name, population), with parent revision
+        self._subtargets = {}
         self._nodeset_reader = self._init_nodesets(run_conf)
         if MPI.rank == 0:
             self.parser.isVerbose = 1
@@ -158,6 +160,7 @@ class TargetManager:
 
     def register_target(self, target):
         self._targets[target.name] = target
+        self._subtargets.clear()
         hoc_target = target.get_hoc_target()
         if hoc_target:
             self.parser.updateTargetList(target)
@@ -166,9 +169,11 @@ class TargetManager:
         """Registers the local nodes so that targets can be scoped to current rank"""
         self.local_nodes.append(local_nodes)
         self.parser.updateTargets(local_nodes.final_gids(), 1)
+        self._subtargets.clear()  # subtargets hold their own copy of the local nodes
 
     def clear_simulation_data(self):
         self.local_nodes.clear()
+        self._subtargets.clear()
         self.parser.updateTargets(Nd.Vector(), 0)
         self.init_hoc_manager(None)  # Init/release cell manager
 
@@ -190,7 +195,15 @@ class TargetManager:
         def get_concrete_target(target):
             """Get a more specific target, depending on specified population prefix"""
             target.update_local_nodes(self.local_nodes)
-            return target if target_pop is None else target.make_subtarget(target_pop)
+            if target_pop is None:
+                return target
+            revision, subtarget = self._subtargets.get((target.name, target_pop), (None, None))
+            if subtarget is None or revision != target.nodes_revision:
+                subtarget = target.make_subtarget(target_pop)
+                if not subtarget.is_void():  # population may still be added. Dont cache
+                    self._subtargets[(target.name, target_pop)] = (target.nodes_revision,
+                                                                   subtarget)
+            return subtarget
 
         # Check cached
         if target_name in self._targets:
@@ -330,6 +343,7 @@ class _TargetInterface(metaclass=ABCMeta):
     """
     Methods that target/target wrappers should implement
     """
+    nodes_revision = 0  # Bumped by append_nodeset so that derived subtargets can be refreshed
 
     @abstractmethod
     def gid_count(self):
@@ -487,6 +501,7 @@ class NodesetTarget(_TargetInterface, _HocTargetInterface):
 
     def append_nodeset(self, nodeset: NodeSet):
         self.nodesets.append(nodeset)
+        self.nodes_revision += 1
 
     @property
     def population_names(self):
@@ -662,6 +677,7 @@ class _HocTarget(_TargetInterface):
             return
         self.population_name = nodeset.population_name
         self.offset = nodeset.offset
+        self.nodes_revision += 1
         self._raw_gids = numpy.asarray(nodeset.raw_gids())
         hoc_gids = compat.hoc_vector(self._raw_gids)
         self.hoc_target = Nd.Target(self.name, hoc_gids, self.population_name)
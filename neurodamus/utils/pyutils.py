@@ -2,10 +2,14 @@
 Collection of generic Python utilities.
 """
 import numpy as np
+import sys
 import weakref
 from bisect import bisect_left
 from enum import EnumMeta
 
+# bisect accepts a key function (with a C implementation) only since Python 3.10
+_BISECT_HAS_KEY = sys.version_info >= (3, 10)
+
 
 class classproperty(object):
     def __init__(self, getter):
@@ -145,12 +149,14 @@ def bin_search(container, key, keyf=None):
     """
     if keyf is None:
         return bisect_left(container, key)
+    if _BISECT_HAS_KEY:
+        return bisect_left(container, key, key=keyf)
 
     binsrch_low = 0
     binsrch_high = len(container)
 
     while binsrch_low < binsrch_high:
-        binsrch_mid = int((binsrch_low + binsrch_high) * 0.5)
+        binsrch_mid = (binsrch_low + binsrch_high) // 2
         if key > keyf(container[binsrch_mid]):
             binsrch_low = binsrch_mid + 1
         else:
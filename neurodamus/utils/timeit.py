@@ -114,8 +114,11 @@ from contextlib import contextmanager, ContextDecorator
 from itertools import chain
 from math import log, floor
 
-from .logging import log_verbose
-from ..core import NeurodamusCore as Nd, MPI, run_only_rank0
+import numpy as np
+
+from . import compat
+from .logging import log_verbose, VERBOSE_LOGLEVEL
+from ..core import MPI, run_only_rank0
 
 
 def human_readable(num):
@@ -132,64 +135,85 @@ def human_readable(num):
 
 
 delim = u'\u255a'
+indent_unit = delim.join('  ')  # indentation per nesting level in stats
 
 
 class _Timer(object):
-    total_time = property(lambda self: self._total_time)
-    accumulated = property(lambda self: self._accumulated)
-    name = property(lambda self: self._name)
-    hits = property(lambda self: self._hits)
+    # Fields are plain (slot) attributes. Only _Timer itself should update them
+    # Times are accumulated as integer nanoseconds, converted to seconds only when shown
+    __slots__ = ("name", "total_time_ns", "accumulated", "hits", "_start_time",
+                 "_last_time_ns", "depth", "leaf")
+
+    total_time = property(lambda self: self.total_time_ns / 1e9)
 
     def __init__(self, name):
-        self._name = name
-        self._total_time = 0
+        self.name = name
+        self.depth = name.count(delim)  # nesting level and base name, for stats display
+        self.leaf = name.rsplit(delim, 1)[-1]
+        self.total_time_ns = 0
         self._start_time = None
-        self._last_time = None
-        self._accumulated = False
-        self._hits = 0
+        self._last_time_ns = None
+        self.accumulated = False
+        self.hits = 0
 
     def start(self):
-        self._start_time = time.perf_counter()
+        self._start_time = time.perf_counter_ns()
         return self
 
     def stop(self):
-        self._last_time = time.perf_counter() - self._start_time
-        if self._total_time:
-            self._accumulated = True
-        self._total_time += self._last_time
-        self._hits += 1
+        self._last_time_ns = time.perf_counter_ns() - self._start_time
+        if self.total_time_ns:
+            self.accumulated = True
+        self.total_time_ns += self._last_time_ns
+        self.hits += 1
         self._start_time = None  # invalidate start time
 
     def log(self, keyword, seq_no=None):
+        if not logging.root.isEnabledFor(VERBOSE_LOGLEVEL):
+            return  # Skip building the message when it won't be emitted
         log_verbose("{:s} {} {:<30s} {:.4f} {:s}".
                     format(keyword,
                            seq_no if seq_no is not None else '',
-                           self._name,
-                           self._last_time,
-                           "=> TotalTime: {:g}".format(self._total_time) if self._accumulated
+                           self.name,
+                           self._last_time_ns / 1e9,
+                           "=> TotalTime: {:g}".format(self.total_time) if self.accumulated
                            else ""))
 
 
+# Fixed rows of the stats table
+_stats_header = "|{:^58s}|{:^10s}|{:^10s}|{:^10s}|{:^19s}|".format(
+    'Event Label', 'Avg.Time', 'Min.Time', 'Max.Time', 'Hits R0 / Total ')
+_stats_rule = "+{:-^111s}+".format('-')
+_stats_row_fmt = "| {:<56s} | {:8.2f} | {:8.2f} | {:8.2f} | {:>7s} / {:<7s} |"
+
+
 class _TimerManager(object):
-    _timers = dict()
-    _timers_sequence = 0
-    _archived_timers = {}
+    def __init__(self):
+        self._timers = {}
+        self._timer_order = []  # current timers, in creation order (stats order)
+        self._timers_sequence = 0
+        self._archived_timers = {}  # archive name -> (timers dict, timer order)
 
     # archive current timers
     def archive(self, archive_name):
-        self._archived_timers[archive_name] = self._timers
+        self._archived_timers[archive_name] = (self._timers, self._timer_order)
         self._timers = dict()
+        self._timer_order = []
 
     def init(self, name):
-        self._timers.setdefault(name, _Timer(name))
-        self._timers[name].start()
+        timer = self._timers.get(name)
+        if timer is None:  # Only create timers once, not on every (re)start
+            timer = self._timers[name] = _Timer(name)
+            self._timer_order.append(timer)
+        timer.start()
 
     def update(self, name, verbose=True):
-        if name not in self._timers.keys():
+        timer = self._timers.get(name)
+        if timer is None:
             raise Exception("{} not initialized in timers dict".format(name))
-        self._timers[name].stop()
+        timer.stop()
         if verbose:
-            self._log_timer(self._timers[name])
+            self._log_timer(timer)
 
     @run_only_rank0
     def _log_timer(self, timer_info):
@@ -200,40 +224,55 @@ class _TimerManager(object):
     # Note: method name kept for reference wrt neurodamus-core timeit.hoc
     def timeit_show_stats(self):
         current_timers_name = "Final Stats" if len(self._archived_timers) else ""
-        for timers_name, timers in chain(self._archived_timers.items(),
-                                         ((current_timers_name, self._timers),)):
-            mpi_times = Nd.Vector(tinfo.total_time for tinfo in timers.values())
-            avg_times = mpi_times.c()
-            MPI.pc.allreduce(avg_times, MPI.SUM)
-            min_times = mpi_times.c()
-            MPI.pc.allreduce(min_times, MPI.MIN)
-            max_times = mpi_times.c()
-            MPI.pc.allreduce(max_times, MPI.MAX)
-
-            nof_hits = Nd.Vector(tinfo.hits for tinfo in timers.values())
-            MPI.pc.allreduce(nof_hits, MPI.SUM)
-
-            self._log_stats(timers_name, timers, avg_times, min_times, max_times, nof_hits)
+        all_timers = list(chain(
+            ((name, timer_order) for name, (_, timer_order) in self._archived_timers.items()),
+            ((current_timers_name, self._timer_order),)))
+        local_tinfos = [tinfo for _, timers in all_timers for tinfo in timers]
+        n_timers = len(local_tinfos)
+        local_times = np.fromiter((tinfo.total_time for tinfo in local_tinfos), "f8", n_timers)
+        local_hits = np.fromiter((tinfo.hits for tinfo in local_tinfos), "f8", n_timers)
+
+        # Fused reductions, for all archives at once: times and hits are summed together,
+        # max and min reduced together as MAX of [times, -times], since min(t) == -max(-t)
+        sums = np.concatenate((local_times, local_hits))
+        maxs = np.concatenate((local_times, -local_times))
+        if MPI.size > 1:  # Serial runs skip collectives, local values are the stats
+            for buf, op in ((sums, MPI.SUM), (maxs, MPI.MAX)):
+                hoc_buf = compat.hoc_vector(buf)
+                MPI.pc.allreduce(hoc_buf, op)
+                buf[:] = hoc_buf.as_numpy()
+            if MPI.rank != 0:
+                return  # Only rank 0 logs stats
+
+        start = 0
+        for timers_name, timers in all_timers:
+            end = start + len(timers)
+            self._log_stats(timers_name, timers,
+                            sums[start:end],
+                            -maxs[n_timers + start:n_timers + end],
+                            maxs[start:end],
+                            sums[n_timers + start:n_timers + end])
+            start = end
 
     @run_only_rank0
     def _log_stats(self, timers_name, timers, avg_times, min_times, max_times, nof_hits):
         stats_name = " TIMEIT STATS {}".format('(' + timers_name + ') ' if timers_name
                                                else timers_name)
         logging.info("+{:=^111s}+".format(stats_name))
-        logging.info("|{:^58s}|{:^10s}|{:^10s}|{:^10s}|{:^19s}|".format(
-            'Event Label', 'Avg.Time', 'Min.Time', 'Max.Time', 'Hits R0 / Total '))
-        logging.info("+{:-^111s}+".format('-'))
-
-        for t, (name, tinfo) in enumerate(timers.items()):
-            base_name = delim.join('  ') * name.count(delim) + name.split(delim)[-1]
-            logging.info("| {:<56s} | {:8.2f} | {:8.2f} | {:8.2f} | {:>7s} / {:<7s} |".format(
-                base_name,
-                avg_times.x[t] / MPI.size,
-                min_times.x[t],
-                max_times.x[t],
+        logging.info(_stats_header)
+        logging.info(_stats_rule)
+
+        # One record per row, as every log line must carry its own level (and time) prefix
+        n_ranks = MPI.size
+        for t, tinfo in enumerate(timers):
+            logging.info(_stats_row_fmt.format(
+                indent_unit * tinfo.depth + tinfo.leaf,
+                avg_times[t] / n_ranks,
+                min_times[t],
+                max_times[t],
                 human_readable(tinfo.hits),
-                human_readable(nof_hits.x[t])))
-        logging.info("+{:-^111s}+".format('-'))
+                human_readable(nof_hits[t])))
+        logging.info(_stats_rule)
 
 
 TimerManager = _TimerManager()  # singleton
@@ -241,15 +280,17 @@ TimerManager = _TimerManager()  # singleton
 
 # Can be used as context manager or decorator
 class timeit(ContextDecorator):
-    curr_path = []
+    curr_path = []  # full (delim-joined) names of the currently open timers, innermost last
 
     def __init__(self, name, verbose=True):
         self._original_name = name
         self._verbose = verbose
 
     def __enter__(self):
-        timeit.curr_path.append(self._original_name)
-        self._name = delim.join(timeit.curr_path)
+        curr_path = timeit.curr_path
+        self._name = curr_path[-1] + delim + self._original_name if curr_path \
+            else self._original_name
+        curr_path.append(self._name)
         TimerManager.init(self._name)
 
     def __exit__(self, exc_type, exc, exc_tb):
@@ -1,3 +1,4 @@
+import numpy
 import pytest
 from pathlib import Path
 from unittest import mock
@@ -141,3 +142,151 @@ def test_population_ids_match():
     assert not pop.ids_match(1, 1)
     assert not pop.ids_match(1, None)
     assert not pop.ids_match(None, 1)
+
+
+class _FakeSrcTarget:
+    name = "src"
+
+    def __init__(self, raw_gids):
+        self._raw_gids = numpy.array(raw_gids, dtype="uint32")
+
+    def is_void(self):
+        return False
+
+    def get_raw_gids(self):
+        return self._raw_gids
+
+    def set_offset(self, _offset):
+        pass
+
+
+class _FakeSynReader:
+    def __init__(self, sgids_per_tgid, sgids_available):
+        self._sgids = {tgid: numpy.array(sgids) for tgid, sgids in sgids_per_tgid.items()}
+        self._sgids_available = sgids_available
+        self.loaded_tgids = []
+
+    def configure_override(self, _mod_override):
+        pass
+
+    def preload_data(self, _gids):
+        pass
+
+    def get_source_gids(self, tgid):
+        return self._sgids[tgid].astype("f8") if self._sgids_available else None
+
+    def get_synapse_parameters(self, tgid):
+        self.loaded_tgids.append(tgid)
+        sgids = self._sgids[tgid].astype("f8")
+        return numpy.rec.fromarrays([sgids, numpy.arange(len(sgids), dtype="f8")],
+                                    names="sgid,row")
+
+
+def _old_conn_params_filter(sgids_per_tgid, src_gids):
+    """The plain python reference: group contiguous sgids, filter by src target"""
+    for tgid, sgids in sgids_per_tgid.items():
+        start = 0
+        for end in range(1, len(sgids) + 1):
+            if end == len(sgids) or sgids[end] != sgids[start]:
+                if src_gids is None or sgids[start] in src_gids:
+                    yield sgids[start], tgid, start, end - start
+                start = end
+
+
+SGIDS_PER_TGID = {
+    1: [1, 1, 2, 3, 3, 3, 9],  # runs at both array boundaries
+    2: [5, 5, 5],              # a single run, no source in src target
+    3: [],                     # no synapses
+    4: [9, 2, 2, 7, 1],        # unsorted sgids, single rows at the boundaries
+    5: [12],                   # sgid beyond the src target max gid
+}
+
+
+@pytest.mark.parametrize("sgids_available", [True, False])
+@pytest.mark.parametrize("src_gids", [None, [1, 3, 9], [2]])
+def test_iterate_conn_params_filter(src_gids, sgids_available):
+    from neurodamus.connection_manager import ConnectionManagerBase
+    manager = object.__new__(ConnectionManagerBase)
+    manager._raw_gids = numpy.array(list(SGIDS_PER_TGID), dtype="uint32")
+    manager._cur_population = _create_population([])
+    manager._synapse_reader = _FakeSynReader(SGIDS_PER_TGID, sgids_available)
+    manager._load_offsets = False
+    manager._total_connections = 0
+    manager.get_updated_population_offsets = lambda *_: (0, 0)
+    src_target = src_gids and _FakeSrcTarget(src_gids)
+
+    conns = [(sgid, tgid, range_start, len(syn_params))
+             for sgid, tgid, syn_params, _, range_start
+             in manager._iterate_conn_params(src_target, None)]
+    expected = list(_old_conn_params_filter(SGIDS_PER_TGID, src_gids and set(src_gids)))
+    assert conns == expected
+    if src_gids == [2] and sgids_available:
+        # tgids without connections from the source target don't get parameters built
+        assert manager._synapse_reader.loaded_tgids == [1, 4]
+
+
+@pytest.mark.parametrize("gjinfo, expected", [
+    ("", []),
+    ("1 3\n", [0]),
+    ("1 3\n2 0\n3 5\n", [0, 6, 6]),
+])
+def test_gj_offsets(tmp_path, gjinfo, expected):
+    from neurodamus.gap_junction import GapJunctionManager
+    (tmp_path / "gjinfo.txt").write_text(gjinfo)
+    gj_manager = object.__new__(GapJunctionManager)
+    gj_offsets = gj_manager._compute_gj_offsets(str(tmp_path))
+    assert gj_offsets.tolist() == expected
+
+
+def _get_config_validator(name):
+    from neurodamus.core.configuration import _SimConfig
+    return next(validator for validator in _SimConfig._validators
+                if validator.__name__ == name)
+
+
+def test_nrn_chunk_cache_config():
+    from types import SimpleNamespace
+    from neurodamus.core.configuration import ConfigurationError
+    nrn_reader_options = _get_config_validator("_nrn_reader_options")
+    config = SimpleNamespace()
+    nrn_reader_options(config, {"NrnChunkCacheBytes": 4194304})
+    assert config.nrn_chunk_cache_bytes == 4194304
+    nrn_reader_options(config, {})
+    assert config.nrn_chunk_cache_bytes is None
+    with pytest.raises(ConfigurationError, match="NrnChunkCacheBytes"):
+        nrn_reader_options(config, {"NrnChunkCacheBytes": 0})
+
+
+def test_open_synapse_file_chunk_cache():
+    from neurodamus.connection_manager import ConnectionManagerBase
+    from neurodamus.core.configuration import _SimConfig
+    manager = object.__new__(ConnectionManagerBase)
+    manager._raw_gids = numpy.array([1, 2], dtype="uint32")
+    manager.SynapseReader = mock.Mock()
+    with mock.patch.object(_SimConfig, "nrn_chunk_cache_bytes", 1 << 22):
+        manager._open_synapse_file("nrn.h5", None, 1)
+    assert manager.SynapseReader.create.call_args.kwargs["chunk_cache_bytes"] == 1 << 22
+
+
+def test_nrn_in_memory_config():
+    from types import SimpleNamespace
+    from neurodamus.core.configuration import ConfigurationError
+    nrn_reader_options = _get_config_validator("_nrn_reader_options")
+    config = SimpleNamespace()
+    nrn_reader_options(config, {"NrnInMemory": "True"})
+    assert config.nrn_in_memory is True
+    nrn_reader_options(config, {})
+    assert config.nrn_in_memory is False
+    with pytest.raises(ConfigurationError, match="NrnInMemory"):
+        nrn_reader_options(config, {"NrnInMemory": "yes"})
+
+
+def test_open_synapse_file_in_memory():
+    from neurodamus.connection_manager import ConnectionManagerBase
+    from neurodamus.core.configuration import _SimConfig
+    manager = object.__new__(ConnectionManagerBase)
+    manager._raw_gids = numpy.array([1, 2], dtype="uint32")
+    manager.SynapseReader = mock.Mock()
+    with mock.patch.object(_SimConfig, "nrn_in_memory", True):
+        manager._open_synapse_file("nrn.h5", None, 1)
+    assert manager.SynapseReader.create.call_args.kwargs["in_memory"] is True
@@ -30,3 +30,42 @@ def test_add_synapses():
     assert len(conn._synapse_params) == n_syns + 1
     for syn_manager in n._circuits.all_synapse_managers():
         syn_manager.finalize(0, False)
+
+
+def test_mod_override_options_follow_config():
+    from unittest import mock
+    from neurodamus import connection
+    from neurodamus.connection import Connection
+    from neurodamus.core.configuration import SimConfig
+
+    with mock.patch.object(Connection, "_mod_overrides", {"MySynapse"}), \
+            mock.patch.object(connection, "_mod_override_options", {}), \
+            mock.patch.dict(SimConfig.synapse_options, {"cao_CR": 2.0}, clear=True), \
+            mock.patch.object(Connection, "_set_mod_override_options") as set_options:
+        Connection._update_mod_override_options()
+        Connection._update_mod_override_options()
+        set_options.assert_called_once_with("MySynapse")
+        # A new configuration with different options must be applied as well
+        SimConfig.synapse_options["cao_CR"] = 1.2
+        Connection._update_mod_override_options()
+        assert set_options.call_count == 2
+        Connection._update_mod_override_options()
+        assert set_options.call_count == 2
+
+
+def test_locations_to_points_per_synapse_fallback():
+    from types import SimpleNamespace
+    from neurodamus.connection import Connection
+
+    class OldTargetManagerHoc:
+        """A hoc TargetManager of older cores, without locationsToPoints"""
+        def locationToPoint(self, gid, isec, ipt, offset):
+            return SimpleNamespace(x=[isec + offset / 10], sclst=[(gid, isec, ipt)])
+
+    syn_params = SynapseParameters.create_array(3)
+    syn_params.isec = [1, 4, 4]
+    syn_params.ipt = [0, 2, 3]
+    syn_params.offset = [0.5, 1, 2.5]
+    locations, sections = Connection._locations_to_points(OldTargetManagerHoc(), 7, syn_params)
+    assert locations.tolist() == [1.05, 4.1, 4.25]
+    assert sections == [(7, 1, 0), (7, 4, 2), (7, 4, 3)]
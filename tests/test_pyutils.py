@@ -5,6 +5,7 @@ from __future__ import print_function, absolute_import
 import numpy
 import pytest
 import logging
+from itertools import chain
 from neurodamus.utils.multimap import MultiMap, GroupedMultiMap
 
 
@@ -118,6 +119,86 @@ def test_flatten_grouped():
     logging.info("%s: %s", d._keys, d._values)
 
 
+@pytest.mark.parametrize("has_key", [True, False])
+def test_bin_search_keyf(has_key, monkeypatch):
+    from neurodamus.utils import pyutils
+    monkeypatch.setattr(pyutils, "_BISECT_HAS_KEY", has_key)
+    items = [(1, "a"), (3, "b"), (7, "c")]
+    first = lambda x: x[0]  # noqa: E731
+    assert pyutils.bin_search(items, 0, first) == 0
+    assert pyutils.bin_search(items, 3, first) == 1
+    assert pyutils.bin_search(items, 4, first) == 2
+    assert pyutils.bin_search(items, 9, first) == 3
+    assert pyutils.bin_search([], 1, first) == 0
+
+
+class _FakeHocVector:
+    def __init__(self, np_array):
+        self._data = numpy.array(np_array, "f8")
+
+    def as_numpy(self):
+        return self._data
+
+
+class _FakePC:
+    """Reduces every allreduce with the buffer another rank sent on the same call"""
+    _reduce_ops = {1: numpy.add, 2: numpy.maximum, 3: numpy.minimum}
+
+    def __init__(self, other_rank_buffers=None):
+        self.sent = []
+        self._other_rank_buffers = other_rank_buffers
+
+    def allreduce(self, hoc_vec, op):
+        data = hoc_vec.as_numpy()
+        self.sent.append(data.copy())
+        if self._other_rank_buffers is not None:
+            data[:] = self._reduce_ops[op](data, self._other_rank_buffers[len(self.sent) - 1])
+
+
+def _timer_manager_stats(monkeypatch, archived_timings, timings, rank=0, size=1, pc=None):
+    """Run timeit_show_stats on a new manager, returning the arguments given to _log_stats"""
+    from types import SimpleNamespace
+    from neurodamus.utils import timeit
+    monkeypatch.setattr(timeit, "MPI", SimpleNamespace(rank=rank, size=size, pc=pc,
+                                                       SUM=1, MAX=2, MIN=3))
+    monkeypatch.setattr(timeit, "compat", SimpleNamespace(hoc_vector=_FakeHocVector))
+    manager = timeit._TimerManager()
+    for archive_name, archive_timings in chain(archived_timings.items(), ((None, timings),)):
+        for name, (seconds, hits) in archive_timings.items():
+            timer = manager._timers[name] = timeit._Timer(name)
+            timer.total_time_ns = int(seconds * 1e9)
+            timer.hits = hits
+            manager._timer_order.append(timer)
+        if archive_name is not None:
+            manager.archive(archive_name)
+    logged = []
+    manager._log_stats = lambda timers_name, timers, *stats: logged.append(
+        (timers_name, [timer.name for timer in timers], [list(values) for values in stats]))
+    manager.timeit_show_stats()
+    return logged
+
+
+def test_timeit_stats_serial(monkeypatch):
+    logged = _timer_manager_stats(monkeypatch, {}, {"a": (1, 1), "b": (2, 3)})
+    assert logged == [("", ["a", "b"], [[1, 2], [1, 2], [1, 2], [1, 3]])]
+
+
+def test_timeit_stats_mpi(monkeypatch):
+    # Timers "b" and "c" never ran on rank 1 (zero time, zero hits)
+    rank1_pc = _FakePC()
+    logged = _timer_manager_stats(monkeypatch, {"Run 1": {"a": (5, 1), "b": (0, 0)}},
+                                  {"a": (1, 1), "c": (0, 0)}, rank=1, size=2, pc=rank1_pc)
+    assert logged == []  # Only rank 0 logs
+    logged = _timer_manager_stats(monkeypatch, {"Run 1": {"a": (1, 1), "b": (2, 2)}},
+                                  {"a": (3, 1), "c": (4, 2)}, rank=0, size=2,
+                                  pc=_FakePC(rank1_pc.sent))
+    # stats: time sums (avg * n_ranks), min times, max times, total hits
+    assert logged == [
+        ("Run 1", ["a", "b"], [[6, 2], [1, 0], [5, 2], [2, 2]]),
+        ("Final Stats", ["a", "c"], [[4, 4], [1, 0], [3, 4], [2, 2]]),
+    ]
+
+
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
     test_map_1()
@@ -116,3 +116,20 @@ class TestStimuli:
         assert stim.stim_vec[STIM1_SAMPLES + 1] == 0.0
         assert stim.time_vec[-1] == 6.0
         assert stim.stim_vec[-1] == 0.0
+
+    def test_add_after_attach(self):
+        """
+        Points added once the source is attached must reach the (playing) hoc Vectors
+        """
+        from neurodamus.core import Neuron
+        sec = Neuron.h.Section(name="soma")
+        stim = self.stim
+        stim.add_pulse(1.2, 10)
+        time_vec, stim_vec = stim.time_vec, stim.stim_vec
+        clamp = stim.attach_to(sec)
+        stim.delay(5)
+        stim.add_pulse(0.8, 5)
+        assert list(time_vec) == [0, 0, 10, 10, 15, 15, 20, 20]
+        assert list(stim_vec) == [0, 1.2, 1.2, 0, 0, 0.8, 0.8, 0]
+        assert stim.time_vec is time_vec and stim.stim_vec is stim_vec
+        clamp.detach()
@@ -311,6 +311,43 @@ def test__constrained_hill():
     npt.assert_allclose(scale_factors(a, b), _constrained_hill(a, b))
 
 
+def _old_constrained_hill(K_half, y):
+    K_half_fourth = K_half**4
+    y_fourth = y**4
+    return (K_half_fourth + 16) / 16 * y_fourth / (K_half_fourth + y_fourth)
+
+
+def test__constrained_hill_exact():
+    from neurodamus.io.synapse_reader import _constrained_hill
+    rng = np.random.default_rng(seed=7)
+    K_half = 5 * rng.random(100)
+    for y in 5 * rng.random(200):  # a few % of numpy powers differ from python's in the last bit
+        npt.assert_array_equal(_constrained_hill(K_half, y), _old_constrained_hill(K_half, y))
+        y = float(y)
+        npt.assert_array_equal(_constrained_hill(K_half, y), _old_constrained_hill(K_half, y))
+        assert _constrained_hill(float(K_half[0]), y) == _old_constrained_hill(float(K_half[0]), y)
+
+
+@pytest.mark.parametrize("u_hill", [[1.11] * 50, 5 * np.random.default_rng(seed=3).random(50)])
+@pytest.mark.parametrize("ca_conc", [None, 1.2, 2.0])
+def test_scale_U_param(u_hill, ca_conc):
+    from neurodamus.io.synapse_reader import SynapseParameters, SynapseReader
+    syn_params = SynapseParameters.create_array(len(u_hill))
+    syn_params.U = np.random.default_rng(seed=5).random(len(u_hill))
+    syn_params.D = 2 * syn_params.U
+    syn_params.u_hill_coefficient = u_hill
+    U, D = syn_params.U.copy(), syn_params.D.copy()
+
+    SynapseReader._scale_U_param(syn_params, ca_conc, ["D"])
+    if ca_conc is None:
+        npt.assert_array_equal(syn_params.U, U)
+        npt.assert_array_equal(syn_params.D, D)
+    else:
+        scale_factors = _old_constrained_hill(np.asarray(u_hill, dtype="f8"), ca_conc)
+        npt.assert_array_equal(syn_params.U, U * scale_factors)
+        npt.assert_array_equal(syn_params.D, D * scale_factors)
+
+
 @pytest.mark.skipif(
     not os.environ.get("NEURODAMUS_NEOCORTEX_ROOT"),
     reason="Test requires loading a neocortex model to run")
@@ -347,3 +384,266 @@ def test_no_edge_creation(capsys):
     assert len(n.circuits.edge_managers) == 0
 
     os.unlink(tmp_config.name)
+
+
+def _write_nrn_file(path, cells, version=5, chunks=None):
+    """Write a minimal nrn.h5 synapse file with one (nsyns x 19) dataset per cell"""
+    import h5py
+    with h5py.File(path, "w") as f:
+        f.create_dataset("info", data=[0]).attrs["version"] = version
+        for gid, data in cells.items():
+            f.create_dataset("a%d" % gid, data=np.asarray(data, dtype="f4"), chunks=chunks)
+
+
+@pytest.fixture
+def nrn_cells():
+    rng = np.random.default_rng(seed=3)
+    # Integer values (exact in f4). Small delays, multiples of dt, aren't changed by rounding
+    cells = {gid: rng.integers(0, 100, (nsyns, 19)) for gid, nsyns in ((1, 4), (2, 7))}
+    for data in cells.values():
+        data[:, 1] = 1
+    return cells
+
+
+def _check_nrn_params(syn_params, data):
+    from neurodamus.io.synapse_reader import SynReaderNRN
+    assert len(syn_params) == len(data)
+    for field, column in SynReaderNRN._field_columns:
+        npt.assert_array_equal(syn_params[field], data[:, column])
+    npt.assert_array_equal(syn_params["nrrp"], data[:, SynReaderNRN._nrrp_column])
+    npt.assert_array_equal(syn_params["u_hill_coefficient"], -1)
+    npt.assert_array_equal(syn_params["conductance_ratio"], -1)
+
+
+@pytest.mark.skipif(
+    not os.environ.get("NEURODAMUS_NEOCORTEX_ROOT"),
+    reason="Test requires loading a neocortex model to run")
+def test_nrn_reader_bulk_read(tmp_path, nrn_cells):
+    from neurodamus.io.synapse_reader import SynapseReader, SynReaderNRN
+    nrn_file = str(tmp_path / "nrn.h5")
+    _write_nrn_file(nrn_file, nrn_cells)
+
+    reader = SynReaderNRN(nrn_file, SynapseReader.SYNAPSES)
+    assert reader.has_nrrp()
+    for gid, data in nrn_cells.items():
+        _check_nrn_params(reader.get_synapse_parameters(gid), data)
+    assert len(reader.get_synapse_parameters(3)) == 0  # no dataset
+
+    # getDataMatrix only serves the dataset last loaded, otherwise returns 0 rows
+    from neurodamus.core import NeurodamusCore as Nd
+    syn_vec = Nd.Vector()
+    assert reader._syn_reader.getDataMatrix("a1", syn_vec) == 0
+    assert syn_vec.size() == 0
+
+
+@pytest.mark.skipif(
+    not os.environ.get("NEURODAMUS_NEOCORTEX_ROOT"),
+    reason="Test requires loading a neocortex model to run")
+def test_nrn_reader_bulk_read_error(tmp_path, nrn_cells):
+    from neurodamus.io.synapse_reader import SynapseReader, SynReaderNRN
+    nrn_file = str(tmp_path / "nrn.h5")
+    _write_nrn_file(nrn_file, nrn_cells)
+    reader = SynReaderNRN(nrn_file, SynapseReader.SYNAPSES)
+
+    class FailingDataMatrix:
+        """Proxy of a HDF5Reader whose getDataMatrix fails, returning 0 rows"""
+        def __init__(self, hdf5_reader):
+            self._reader = hdf5_reader
+
+        def __getattr__(self, name):
+            return getattr(self._reader, name)
+
+        def getDataMatrix(self, *_):
+            return 0
+
+    reader._syn_reader = FailingDataMatrix(reader._syn_reader)
+    with pytest.raises(RuntimeError, match="Failed to read synapse dataset a2"):
+        reader.get_synapse_parameters(2)
+
+
+@pytest.mark.skipif(
+    not os.environ.get("NEURODAMUS_NEOCORTEX_ROOT"),
+    reason="Test requires loading a neocortex model to run")
+def test_nrn_reader_chunk_cache(tmp_path, nrn_cells):
+    from neurodamus.io.synapse_reader import SynapseReader, SynReaderNRN
+    nrn_file = str(tmp_path / "nrn.h5")
+    _write_nrn_file(nrn_file, nrn_cells, chunks=(2, 19))
+
+    reader = SynReaderNRN(nrn_file, SynapseReader.SYNAPSES, chunk_cache_bytes=4 << 20)
+    for gid, data in nrn_cells.items():
+        _check_nrn_params(reader.get_synapse_parameters(gid), data)
+
+
+@pytest.mark.skipif(
+    not os.environ.get("NEURODAMUS_NEOCORTEX_ROOT"),
+    reason="Test requires loading a neocortex model to run")
+def test_nrn_reader_in_memory(tmp_path, nrn_cells):
+    from neurodamus.io.synapse_reader import SynapseReader, SynReaderNRN
+    nrn_file = str(tmp_path / "nrn.h5")
+    _write_nrn_file(nrn_file, nrn_cells)
+
+    reader = SynReaderNRN(nrn_file, SynapseReader.SYNAPSES, in_memory=True)
+    for gid, data in nrn_cells.items():
+        _check_nrn_params(reader.get_synapse_parameters(gid), data)
+
+    # Multiple files would be loaded whole over and over, as cells are read
+    _write_nrn_file(nrn_file + ".1", nrn_cells)
+    with pytest.raises(RuntimeError, match="requires a single synapse file"):
+        SynReaderNRN(nrn_file, SynapseReader.SYNAPSES, n_synapse_files=2, in_memory=True)
+
+
+@pytest.mark.skipif(
+    not os.environ.get("NEURODAMUS_NEOCORTEX_ROOT"),
+    reason="Test requires loading a neocortex model to run")
+def test_nrn_reader_getdata_fallback(tmp_path, nrn_cells):
+    from neurodamus.io.synapse_reader import SynapseReader, SynReaderNRN
+    nrn_file = str(tmp_path / "nrn.h5")
+    _write_nrn_file(nrn_file, nrn_cells)
+    reader = SynReaderNRN(nrn_file, SynapseReader.SYNAPSES)
+
+    class OldHDF5Reader:
+        """Proxy of a HDF5Reader predating getDataMatrix"""
+        def __init__(self, hdf5_reader):
+            self._reader = hdf5_reader
+
+        def __getattr__(self, name):
+            if name == "getDataMatrix":
+                raise AttributeError(name)
+            return getattr(self._reader, name)
+
+    reader._syn_reader = OldHDF5Reader(reader._syn_reader)
+    for gid, data in nrn_cells.items():
+        _check_nrn_params(reader.get_synapse_parameters(gid), data)
+
+
+class _FakeHDF5Reader:
+    """Mimics the HDF5Reader mod of older cores, serving the datasets value by value"""
+    def __init__(self, cells):
+        self._datasets = {"a%d" % gid: np.asarray(data, dtype="f4") for gid, data in cells.items()}
+        self._loaded = None
+
+    def loadData(self, name):
+        if name not in self._datasets:
+            return -1
+        self._loaded = name
+        return 0
+
+    def numberofrows(self, name):
+        return len(self._datasets[name]) if name == self._loaded else 0
+
+    def getNoOfColumns(self, name):
+        return self._datasets[name].shape[1]
+
+    def getData(self, name, row, column):
+        return float(self._datasets[name][row, column])
+
+
+class _FakeHDF5ReaderBulk(_FakeHDF5Reader):
+    """Mimics the current HDF5Reader mod, with getDataMatrix"""
+    def getDataMatrix(self, name, vec):
+        vec.values = self._datasets[name].ravel().tolist()
+        return len(self._datasets[name])
+
+
+class _FakeVector:
+    def __init__(self):
+        self.values = []
+
+    def as_numpy(self):
+        return np.array(self.values)
+
+
+@pytest.mark.parametrize("reader_cls", [_FakeHDF5Reader, _FakeHDF5ReaderBulk])
+def test_nrn_reader_load_params(nrn_cells, reader_cls):
+    from types import SimpleNamespace
+    from unittest import mock
+    from neurodamus.io import synapse_reader
+    reader = object.__new__(synapse_reader.SynReaderNRN)
+    reader._syn_reader = reader_cls(nrn_cells)
+    reader._n_synapse_files = 1
+    reader.nrn_version = 5
+
+    with mock.patch.object(synapse_reader, "Nd", SimpleNamespace(Vector=_FakeVector)):
+        for gid, data in nrn_cells.items():
+            _check_nrn_params(reader._load_synapse_parameters(gid), data)
+        assert len(reader._load_synapse_parameters(3)) == 0  # no dataset
+
+
+class _FakeSelection:
+    def __init__(self, edge_ids):
+        self._edge_ids = np.asarray(edge_ids, dtype="uint64")
+
+    def flatten(self):
+        return self._edge_ids
+
+
+class _FakeEdgePopulation:
+    """Mimics a libsonata EdgePopulation whose afferent edges are not sorted by target"""
+    def __init__(self, target_ids, source_ids, attributes):
+        self._target_ids = np.asarray(target_ids, dtype="uint64")
+        self._source_ids = np.asarray(source_ids, dtype="uint64")
+        self._attributes = attributes
+        self.attribute_names = set(attributes)
+
+    def afferent_edges(self, node_ids):
+        edge_ids = np.flatnonzero(np.isin(self._target_ids, node_ids))
+        return _FakeSelection(edge_ids[::-1])
+
+    def target_nodes(self, selection):
+        return self._target_ids[selection.flatten()]
+
+    def source_nodes(self, selection):
+        return self._source_ids[selection.flatten()]
+
+    def get_attribute(self, name, selection):
+        return self._attributes[name][selection.flatten()]
+
+
+def test_sonata_reader_preload():
+    from types import SimpleNamespace
+    from unittest import mock
+    from neurodamus.io import synapse_reader
+    rng = np.random.default_rng(1)
+    n_edges = 50
+    target_ids = rng.integers(0, 8, n_edges)
+    source_ids = rng.integers(0, 20, n_edges)
+    attributes = {name: rng.random(n_edges) for name in (
+        "conductance", "u_syn", "depression_time", "facilitation_time", "decay_time",
+        "afferent_section_pos", "extra_param")}
+    attributes["delay"] = (rng.random(n_edges) * 5).astype("f4")
+    attributes["syn_type_id"] = rng.integers(0, 120, n_edges)
+    attributes["n_rrp_vesicles"] = rng.integers(1, 4, n_edges)
+    attributes["afferent_section_id"] = rng.integers(0, 100, n_edges)
+    # u_hill_coefficient and conductance_scale_factor are missing (optional)
+
+    reader = object.__new__(synapse_reader.SonataReader)
+    reader._population = _FakeEdgePopulation(target_ids, source_ids, attributes)
+    reader._attribute_names = set(attributes)
+    reader._data = {}
+    reader._syn_params = {}
+    reader._extra_fields = ("extra_param",)
+    reader._extra_fields_parameters = synapse_reader._override_synapse_parameters(
+        reader._extra_fields)
+    reader._uhill_property_avail = False
+
+    with mock.patch.object(synapse_reader, "Nd", SimpleNamespace(dt=0.025)):
+        reader.preload_data([6, 2, 3])
+        reader.preload_data([5, 1, 2, 8, 4])  # 8 has no edges
+        for gid in range(1, 9):
+            edge_ids = np.flatnonzero(target_ids == gid - 1)[::-1]  # as given by the file
+            params = reader.get_synapse_parameters(gid)
+            npt.assert_array_equal(reader.get_property(gid, "tgid"), gid)
+            npt.assert_array_equal(params.sgid, source_ids[edge_ids] + 1)
+            npt.assert_array_equal(reader.get_property(gid, "synapse_index"), edge_ids)
+            for field, attribute in (("weight", "conductance"), ("U", "u_syn"),
+                                     ("D", "depression_time"), ("F", "facilitation_time"),
+                                     ("DTC", "decay_time"), ("synType", "syn_type_id"),
+                                     ("nrrp", "n_rrp_vesicles"), ("isec", "afferent_section_id"),
+                                     ("offset", "afferent_section_pos"),
+                                     ("extra_param", "extra_param")):
+                npt.assert_array_equal(params[field], attributes[attribute][edge_ids])
+            npt.assert_array_equal(params.u_hill_coefficient, -1)
+            npt.assert_array_equal(params.conductance_ratio, -1)
+            npt.assert_array_equal(params.ipt, -1)
+            delays = attributes["delay"][edge_ids].astype("f8")
+            npt.assert_array_equal(params.delay, (delays / 0.025 + 1e-5).astype("i4") * 0.025)
@@ -118,3 +118,25 @@ def test_nodeset_gids():
     )
     gids = t4.gids()
     npt.assert_array_equal(gids.as_numpy(), [])
+
+
+@pytest.mark.forked
+def test_cached_subtarget_follows_parent_nodesets():
+    from neurodamus.target_manager import NodesetTarget, TargetManager
+    nodes_popA = NodeSet([1, 2]).register_global("pop_A")
+    nodes_popB = NodeSet([1, 2, 3]).register_global("pop_B")
+    # Avoid creating the hoc TargetParser, only the cache logic is under test
+    target_manager = object.__new__(TargetManager)
+    target_manager._targets = {}
+    target_manager._subtargets = {}
+    target_manager.local_nodes = []
+    target = NodesetTarget("t1", [nodes_popA])
+    target_manager._targets["t1"] = target
+
+    assert target_manager.get_target("t1", "pop_B").is_void()
+    subtarget = target_manager.get_target("t1", "pop_A")
+    assert target_manager.get_target("t1", "pop_A") is subtarget
+    target.append_nodeset(nodes_popB)
+    subtarget_b = target_manager.get_target("t1", "pop_B")
+    assert not subtarget_b.is_void()
+    npt.assert_array_equal(subtarget_b.get_raw_gids(), [1, 2, 3])